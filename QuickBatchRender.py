@@ -19,82 +19,2236 @@
 """
 1.0
     Split off to separate addon.
+
+1.1
+    Added parallel rendering of strips in background Blender processes.
+    Added a render cache so unchanged strips are not rendered again.
+    Long strips can be split into chunks that are rendered at the same time.
+    Batches are recorded in a journal, and an interrupted batch can be resumed.
+    Animation curves are indexed once per batch and keyframes are copied in bulk.
+    Temporary render scenes only contain the strip being rendered and the strips it needs.
+    Effect inputs are rewired through an index of dependent effects, and strips are rendered in dependency order.
+    The next render starts as soon as the render complete handler fires, instead of on a 1 second timer.
+    Per-strip render metrics are logged, and the panel shows an estimate of the time remaining.
+    Render queue building is split out of invoke() so it can be benchmarked.
+    Added a command line entry point that runs a batch in background mode from a job spec file.
+    Strips that render to the same output are rendered once, and every copy imports the shared render.
+    Unchanged strips already in the format of their preset are linked into the render directory instead of rendered.
+    Audio strips are rendered by background processes alongside the video strips.
+    The batch scene can be a copy of the sequencer only, sharing objects and other data with the original scene.
+    Strips can be rendered to a local scratch folder, and moved to the render directory on background threads while the next strip renders.
+    Rendered files are verified on a background thread before they are imported, strips with missing, empty or corrupt files are rendered again.
+    Image sequence frames are recorded by source frame, so a trimmed or moved strip only renders the frames it doesn't have yet.
+    Effect strips can be rendered too, once the strips they use are rendered, with independent effects rendering at the same time.
+    Added a meta strip mode that renders the strips inside metas as separate jobs, then each meta from its rendered strips.
+    Added a batch planner that estimates render time and disk space from the metrics of earlier batches, without rendering.
 """
 
 
-import bpy
-import os
+import bpy
+import os
+import sys
+import array
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import argparse
+import subprocess
+import fnmatch
+import concurrent.futures
+try:
+    import numpy
+except ImportError:
+    numpy = None
+try:
+    import toml
+except ImportError:
+    toml = None
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+MOVIE_FORMATS = ['AVI_JPEG', 'AVI_RAW', 'FRAMESERVER', 'H264', 'FFMPEG', 'THEORA', 'XVID']
+
+
+bl_info = {
+    "name": "Quick Batch Render",
+    "description": "Render sequences in the timeline to individual files and automatically create a new copy of the current scene with these strips replaced with the rendered versions.",
+    "author": "Hudson Barkley (Snu/snuq/Aritodo)",
+    "version": (1, 1, 0),
+    "blender": (2, 79, 0),
+    "location": "Sequencer Panel",
+    "wiki_url": "https://github.com/snuq/QuickBatchRender",
+    "tracker_url": "https://github.com/snuq/QuickBatchRender/issues",
+    "category": "Sequencer"
+}
+
+
+def curve_sequence_name(data_path):
+    """Returns the name of the sequence an animation curve data path belongs to, or None if it doesn't animate a sequence
+    Arguments:
+        data_path: String, an FCurve data_path such as 'sequence_editor.sequences_all["Name"].blend_alpha'"""
+
+    path_start = data_path.split('[', 1)[0]
+    path_end = data_path.split(']')[-1]
+    name_start = len(path_start) + 2
+    name_end = len(data_path) - len(path_end) - 2
+    if name_end < name_start or data_path[name_start-2:name_start] != '["' or data_path[name_end:name_end+2] != '"]':
+        return None
+    return data_path[name_start:name_end]
+
+
+def build_curve_index(scene):
+    """Returns a dictionary of the animation curves of a scene by the name of the sequence they animate, so a batch only reads the curves once
+    Arguments:
+        scene: Scene object"""
+
+    index = {}
+    if hasattr(scene.animation_data, 'action') and scene.animation_data.action:
+        for fcurve in scene.animation_data.action.fcurves:
+            name = curve_sequence_name(fcurve.data_path)
+            if name is not None:
+                index.setdefault(name, []).append(fcurve)
+    return index
+
+
+def sequence_fcurves(sequence, scene, curve_index=None):
+    """Returns a list of the animation curves in a scene that belong to a sequence
+    Arguments:
+        sequence: VSE Sequence object to find the curves of
+        scene: scene that sequence is in
+        curve_index: Dictionary returned by build_curve_index() for the scene, will be built if not given"""
+
+    if curve_index is None:
+        curve_index = build_curve_index(scene)
+    return curve_index.get(sequence.name, [])
+
+
+KEYFRAME_FLOATS = [('co', 2), ('handle_left', 2), ('handle_right', 2), ('amplitude', 1), ('back', 1), ('period', 1)]
+KEYFRAME_ENUMS = ['type', 'interpolation', 'easing', 'handle_left_type', 'handle_right_type']
+
+
+def float_buffer(length):
+    """Returns a zeroed buffer of 32 bit floats for use with foreach_get and foreach_set, a numpy array if numpy is available
+    Arguments:
+        length: Integer, number of floats"""
+
+    if numpy is not None:
+        return numpy.zeros(length, dtype=numpy.float32)
+    return array.array('f', [0.0]) * length
+
+
+def keyframe_floats(keyframe_points):
+    """Returns a dictionary of buffers holding the float values of all keyframe points of a curve, read in bulk
+    Arguments:
+        keyframe_points: FCurveKeyframePoints collection"""
+
+    count = len(keyframe_points)
+    buffers = {}
+    for attribute, size in KEYFRAME_FLOATS:
+        buffer = float_buffer(count * size)
+        keyframe_points.foreach_get(attribute, buffer)
+        buffers[attribute] = buffer
+    return buffers
+
+
+def copy_keyframes(fcurve, new_curve):
+    """Copies all keyframe points from one curve to an empty curve.
+    Float values are transferred in bulk, enum values can't be, so they are only set on keyframes where they differ from a new keyframe.
+    Arguments:
+        fcurve: FCurve object to copy from
+        new_curve: FCurve object to copy to"""
+
+    keyframe_points = fcurve.keyframe_points
+    count = len(keyframe_points)
+    if count == 0:
+        return
+    new_keyframe_points = new_curve.keyframe_points
+    new_keyframe_points.add(count)
+    for attribute, buffer in keyframe_floats(keyframe_points).items():
+        new_keyframe_points.foreach_set(attribute, buffer)
+    defaults = [getattr(new_keyframe_points[0], attribute) for attribute in KEYFRAME_ENUMS]
+    for keyframe, new_keyframe in zip(keyframe_points, new_keyframe_points):
+        for attribute, default in zip(KEYFRAME_ENUMS, defaults):
+            value = getattr(keyframe, attribute)
+            if value != default:
+                setattr(new_keyframe, attribute, value)
+
+
+def copy_curves(copy_from, copy_to, scene_from, scene_to, curve_index=None):
+    """Copies animation curves from one sequence to another, this is needed since the copy operator doesn't do this...
+    Arguments:
+        copy_from: VSE Sequence object to copy from
+        copy_to: VSE Sequence object to copy to
+        scene_from: scene that copy_from is in
+        scene_to: scene that copy_to is in
+        curve_index: Dictionary returned by build_curve_index() for scene_from, will be built if not given"""
+    if hasattr(scene_from.animation_data, 'action'):
+        scene_to.animation_data_create()
+        scene_to.animation_data.action = bpy.data.actions.new(name=scene_to.name+'Action')
+        for fcurve in sequence_fcurves(copy_from, scene_from, curve_index):
+            path = fcurve.data_path
+            path_start = path.split('[', 1)[0]
+            path_end = path.split(']')[-1]
+            new_path = path_start+'["'+copy_to.name+'"]'+path_end
+            new_curve = scene_to.animation_data.action.fcurves.new(data_path=new_path, index=fcurve.array_index)
+            new_curve.extrapolation = fcurve.extrapolation
+            new_curve.mute = fcurve.mute
+            copy_keyframes(fcurve, new_curve)
+            new_curve.update()
+
+
+EFFECT_INPUTS = ['input_1', 'input_2', 'input_3']
+
+
+def effect_inputs(sequence):
+    """Returns a list of the input sequences of an effect sequence, empty for other sequences
+    Arguments:
+        sequence: VSE Sequence object"""
+
+    inputs = []
+    for attribute in EFFECT_INPUTS:
+        input_sequence = getattr(sequence, attribute, None)
+        if input_sequence is not None:
+            inputs.append(input_sequence)
+    return inputs
+
+
+def all_inputs(sequence):
+    """Returns a list of every sequence an effect sequence depends on: its inputs, their inputs, and so on
+    Arguments:
+        sequence: VSE Sequence object"""
+
+    inputs = []
+    check = effect_inputs(sequence)
+    while check:
+        input_sequence = check.pop()
+        if input_sequence not in inputs:
+            inputs.append(input_sequence)
+            check.extend(effect_inputs(input_sequence))
+    return inputs
+
+
+def meta_sequences(sequence):
+    """Returns a list of every sequence inside a meta sequence, including the sequences inside metas in it, empty for other sequences
+    Arguments:
+        sequence: VSE Sequence object"""
+
+    contents = []
+    check = list(getattr(sequence, 'sequences', []))
+    while check:
+        sub_sequence = check.pop()
+        contents.append(sub_sequence)
+        check.extend(getattr(sub_sequence, 'sequences', []))
+    return contents
+
+
+def build_dependency_index(sequences):
+    """Returns a dictionary listing the effect sequences that use each sequence as an input, by the name of the input sequence
+    Arguments:
+        sequences: Collection of all VSE Sequence objects in a scene, sequence_editor.sequences_all"""
+
+    dependents = {}
+    for sequence in sequences:
+        for input_sequence in effect_inputs(sequence):
+            dependents.setdefault(input_sequence.name, []).append(sequence)
+    return dependents
+
+
+def replace_dependency(dependents, old_sequence, new_sequence):
+    """Points every effect using old_sequence as an input to new_sequence instead, and updates the dependency index to match.
+    Only the effects that actually use old_sequence are touched.
+    Arguments:
+        dependents: Dictionary returned by build_dependency_index()
+        old_sequence: VSE Sequence object being replaced
+        new_sequence: VSE Sequence object replacing it, this is not an effect"""
+
+    users = dependents.pop(old_sequence.name, [])
+    for user in users:
+        for attribute in EFFECT_INPUTS:
+            if getattr(user, attribute, None) == old_sequence:
+                setattr(user, attribute, new_sequence)
+    if users:
+        dependents[new_sequence.name] = users
+    #if the old sequence was an effect itself, it no longer uses its inputs
+    for input_sequence in effect_inputs(old_sequence):
+        input_users = dependents.get(input_sequence.name, [])
+        if old_sequence in input_users:
+            input_users.remove(old_sequence)
+
+
+def dependency_order(sequences):
+    """Returns a list of sequences sorted so each one comes after any sequence in the list that it depends on through effect inputs,
+    sequences that don't depend on each other keep their order
+    Arguments:
+        sequences: List of VSE Sequence objects"""
+
+    depths = {}
+
+    def depth(sequence):
+        if sequence.name not in depths:
+            inputs = effect_inputs(sequence)
+            depths[sequence.name] = 1 + max([depth(input_sequence) for input_sequence in inputs]) if inputs else 0
+        return depths[sequence.name]
+    return sorted(sequences, key=depth)
+
+
+def select_for_copy(sequence, dependents):
+    """Selects a sequence for the sequencer copy operator along with all of its inputs, and any effects that use nothing but those.
+    The copy operator refuses a selection if an effect that is not selected uses a selected sequence, so instead of selecting every
+    strip connected to the sequence, the other effects using a selected sequence are pointed at one of their own unselected inputs
+    until restore_inputs() is called after the copy.  Nothing else in the meta being edited should be selected.
+    Arguments:
+        sequence: VSE Sequence object
+        dependents: Dictionary returned by build_dependency_index()
+    Returns: Tuple of the list of selected sequences, and a list of the changed effect inputs to give to restore_inputs()"""
+
+    selection = [sequence] + all_inputs(sequence)
+    names = set(selected.name for selected in selection)
+    #effects made only from the selection can't be left out of it
+    check = list(selection)
+    while check:
+        for user in dependents.get(check.pop().name, []):
+            if user.name not in names and all(input_sequence.name in names for input_sequence in effect_inputs(user)):
+                selection.append(user)
+                names.add(user.name)
+                check.append(user)
+
+    #every other effect using the selection has at least one input outside of it
+    changed = []
+    for selected in selection:
+        selected.select = True
+        for user in dependents.get(selected.name, []):
+            if user.name in names:
+                continue
+            outside = [input_sequence for input_sequence in effect_inputs(user) if input_sequence.name not in names]
+            for attribute in EFFECT_INPUTS:
+                if getattr(user, attribute, None) == selected:
+                    changed.append((user, attribute, selected))
+                    setattr(user, attribute, outside[0])
+    return selection, changed
+
+
+def restore_inputs(changed):
+    """Points effects changed by select_for_copy() back at their original inputs
+    Arguments:
+        changed: List of changed effect inputs returned by select_for_copy()"""
+
+    for user, attribute, input_sequence in reversed(changed):
+        setattr(user, attribute, input_sequence)
+
+
+def build_meta_parents(sequences):
+    """Returns a dictionary of the meta sequence that directly contains each sequence inside a meta, by sequence name
+    Arguments:
+        sequences: Collection of all VSE Sequence objects in a scene, sequence_editor.sequences_all"""
+
+    parents = {}
+    for sequence in sequences:
+        if sequence.type == 'META':
+            for sub_sequence in sequence.sequences:
+                parents[sub_sequence.name] = sequence
+    return parents
+
+
+def meta_path(sequence, meta_parents):
+    """Returns a list of the meta sequences a sequence is inside of, outermost first
+    Arguments:
+        sequence: VSE Sequence object
+        meta_parents: Dictionary returned by build_meta_parents()"""
+
+    metas = []
+    parent = meta_parents.get(sequence.name)
+    while parent is not None:
+        metas.insert(0, parent)
+        parent = meta_parents.get(parent.name)
+    return metas
+
+
+def scene_context(scene):
+    """Returns a context override for running operators on a scene without switching the screen to it.
+    In background mode there is no active window, so the first window of the file and a sequencer area in it are used, if there are any.
+    Arguments:
+        scene: Scene object"""
+
+    override = bpy.context.copy()
+    override['scene'] = scene
+    if override.get('window') is None:
+        for window in bpy.context.window_manager.windows:
+            override['window'] = window
+            override['screen'] = window.screen
+            break
+    screen = override.get('screen')
+    area = override.get('area')
+    if screen and (area is None or area.type != 'SEQUENCE_EDITOR'):
+        for area in screen.areas:
+            if area.type == 'SEQUENCE_EDITOR':
+                override['area'] = area
+                for region in area.regions:
+                    if region.type == 'WINDOW':
+                        override['region'] = region
+                break
+    return override
+
+
+def new_scene(scene, scene_type):
+    """Creates a scene with the scene.new operator, which copies the render settings of the scene unlike bpy.data.scenes.new()
+    Arguments:
+        scene: Scene object to create the new scene from
+        scene_type: String, type of new scene, 'EMPTY', 'LINK_OBJECTS', 'FULL_COPY' and so on
+    Returns: The new Scene object"""
+
+    existing = set(old_scene.name for old_scene in bpy.data.scenes)
+    bpy.ops.scene.new(scene_context(scene), type=scene_type)
+    for created_scene in bpy.data.scenes:
+        if created_scene.name not in existing:
+            return created_scene
+    return None
+
+
+def copy_sequencer(scene, linked_scene):
+    """Copies the sequencer strips of a scene and their animation into a scene created with the 'LINK_OBJECTS' type,
+    since Blender only copies the sequencer for a full copy, and removes the sequencer curves from the copied action of any other
+    Arguments:
+        scene: Scene object to copy the strips from
+        linked_scene: Scene object created from scene, with no sequence editor"""
+
+    if not scene.sequence_editor:
+        return
+    sequences = scene.sequence_editor.sequences
+    selected = set(sequence.name for sequence in sequences if sequence.select)
+    for sequence in sequences:
+        sequence.select = True
+    bpy.ops.sequencer.copy(scene_context(scene))
+    for sequence in sequences:
+        sequence.select = sequence.name in selected
+    linked_scene.sequence_editor_create()
+    #the linked scene is empty, so pasted sequences keep their names, and their selection is set to match the original
+    bpy.ops.sequencer.paste(scene_context(linked_scene))
+    for sequence in linked_scene.sequence_editor.sequences:
+        sequence.select = sequence.name in selected
+
+    fcurves = []
+    if hasattr(scene.animation_data, 'action') and scene.animation_data.action:
+        fcurves = [fcurve for fcurve in scene.animation_data.action.fcurves if curve_sequence_name(fcurve.data_path) is not None]
+    if fcurves:
+        linked_scene.animation_data_create()
+        if not linked_scene.animation_data.action:
+            linked_scene.animation_data.action = bpy.data.actions.new(name=linked_scene.name+'Action')
+        action = linked_scene.animation_data.action
+        for fcurve in fcurves:
+            new_curve = action.fcurves.new(data_path=fcurve.data_path, index=fcurve.array_index)
+            new_curve.extrapolation = fcurve.extrapolation
+            new_curve.mute = fcurve.mute
+            copy_keyframes(fcurve, new_curve)
+            new_curve.update()
+
+
+def delete_scene(scene):
+    """Deletes a scene with the scene.delete operator, any screen showing the scene is switched to another one
+    Arguments:
+        scene: Scene object to delete"""
+
+    bpy.ops.scene.delete(scene_context(scene))
+
+
+def enter_metas(scene, metas):
+    """Enters nested meta sequences for editing, so sequencer operators work on the sequences inside the last one
+    Arguments:
+        scene: Scene object the meta sequences are in
+        metas: List of meta sequences, outermost first, as returned by meta_path()"""
+
+    override = scene_context(scene)
+    for meta in metas:
+        meta.select = True
+        scene.sequence_editor.active_strip = meta
+        bpy.ops.sequencer.meta_toggle(override)
+
+
+def exit_metas(scene, metas):
+    """Leaves meta sequences entered by enter_metas()
+    Arguments:
+        scene: Scene object the meta sequences are in
+        metas: List of meta sequences that were entered"""
+
+    override = scene_context(scene)
+    for meta in metas:
+        scene.sequence_editor.active_strip = None
+        bpy.ops.sequencer.meta_toggle(override)
+    #leaving a meta selects it and everything in it, deselect them again so only the strips being copied are ever selected
+    if metas:
+        metas[0].select = False
+        for sequence in meta_sequences(metas[0]):
+            sequence.select = False
+
+
+def rna_values(data, skip=()):
+    """Returns a list of [name, value] pairs for all the simple properties of a Blender data object, used for building render keys
+    Arguments:
+        data: Blender object with a bl_rna, such as a Sequence or Modifier
+        skip: List of property names to leave out"""
+
+    values = []
+    for prop in data.bl_rna.properties:
+        identifier = prop.identifier
+        if identifier == 'rna_type' or identifier in skip:
+            continue
+        if prop.type not in ['BOOLEAN', 'INT', 'FLOAT', 'STRING', 'ENUM']:
+            continue
+        value = getattr(data, identifier, None)
+        if prop.type == 'ENUM' and prop.is_enum_flag:
+            value = sorted(value)
+        elif getattr(prop, 'array_length', 0) > 0:
+            value = list(value)
+        values.append([identifier, value])
+    return values
+
+
+def file_signature(filepath):
+    """Returns the absolute path, size and modification time of a file, used to tell if a source file has changed
+    Arguments:
+        filepath: String, path to the file, may be relative to the blend file"""
+
+    path = os.path.abspath(bpy.path.abspath(filepath))
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return [path, None, None]
+    return [path, stat.st_size, stat.st_mtime]
+
+
+KEYFRAME_COORDINATES = ['co', 'handle_left', 'handle_right']
+
+
+def curve_values(fcurve, origin=None):
+    """Returns a list describing an animation curve and its keyframes, without the name of the sequence it animates
+    Arguments:
+        fcurve: FCurve object
+        origin: Frame number to give keyframe times relative to, or None for absolute times"""
+
+    values = [fcurve.data_path.split(']')[-1], fcurve.array_index, fcurve.extrapolation, fcurve.mute]
+    for attribute, buffer in sorted(keyframe_floats(fcurve.keyframe_points).items()):
+        floats = [float(value) for value in buffer]
+        if origin is not None and attribute in KEYFRAME_COORDINATES:
+            floats[0::2] = [frame - origin for frame in floats[0::2]]
+        values.append([attribute, floats])
+    for attribute in KEYFRAME_ENUMS:
+        values.append([attribute, [getattr(keyframe, attribute) for keyframe in fcurve.keyframe_points]])
+    return values
+
+
+SEQUENCE_KEY_SKIP = ['name', 'select', 'select_left_handle', 'select_right_handle', 'lock', 'channel']
+SEQUENCE_POSITION = ['frame_start', 'frame_final_start', 'frame_final_end']
+SEQUENCE_TRIM = ['frame_offset_start', 'frame_offset_end', 'frame_final_start', 'frame_final_end', 'frame_final_duration']
+
+
+def sequence_values(sequence, scene, include_modifiers, curve_index=None, origin=None, trim=True):
+    """Returns a list describing everything about a sequence that affects how it renders, sub-sequences of meta strips are included
+    Arguments:
+        sequence: VSE Sequence object
+        scene: scene that sequence is in
+        include_modifiers: Boolean, whether modifiers will be rendered into the output
+        curve_index: Dictionary returned by build_curve_index() for the scene
+        origin: Frame number to give the position and keyframe times of the sequence relative to, or None for absolute frames
+        trim: Boolean, include which part of the sequence is used.  Sub-sequences of meta strips always include it.
+    Returns: List, or None if the sequence uses data that can not be checked for changes, such as a scene strip"""
+
+    properties = rna_values(sequence, skip=SEQUENCE_KEY_SKIP if trim else SEQUENCE_KEY_SKIP + SEQUENCE_TRIM)
+    if origin is not None:
+        for value in properties:
+            if value[0] in SEQUENCE_POSITION:
+                value[1] = value[1] - origin
+    values = [sequence.type, properties]
+    for attribute in ['crop', 'transform', 'colorbalance']:
+        sub_data = getattr(sequence, attribute, None)
+        if sub_data is not None:
+            values.append([attribute, rna_values(sub_data)])
+    if sequence.type == 'MOVIE':
+        values.append(file_signature(sequence.filepath))
+    elif sequence.type == 'IMAGE':
+        for element in sequence.elements:
+            values.append(file_signature(os.path.join(sequence.directory, element.filename)))
+    elif sequence.type == 'SOUND':
+        values.append(file_signature(sequence.sound.filepath))
+    elif sequence.type == 'MOVIECLIP':
+        values.append(file_signature(sequence.clip.filepath))
+    elif sequence.type == 'META':
+        for sub_sequence in sequence.sequences:
+            sub_values = sequence_values(sub_sequence, scene, True, curve_index, origin)
+            if sub_values is None:
+                return None
+            values.append(sub_values)
+    elif sequence.type in ['SCENE', 'MASK']:
+        return None
+    for input_sequence in effect_inputs(sequence):
+        #an effect renders differently if anything about its inputs changes
+        input_values = sequence_values(input_sequence, scene, True, curve_index, origin)
+        if input_values is None:
+            return None
+        values.append(input_values)
+    if include_modifiers:
+        for modifier in sequence.modifiers:
+            values.append([modifier.type, rna_values(modifier, skip=['name', 'show_expanded'])])
+    if curve_index is None:
+        curve_index = build_curve_index(scene)
+    for fcurve in sequence_fcurves(sequence, scene, curve_index):
+        values.append(curve_values(fcurve, origin))
+    return values
+
+
+def render_key(sequence, scene, setting, transparent, curve_index=None, relative=False, trim=True):
+    """Returns a hash of everything that affects the rendered output of a sequence, or an empty string if it can't be cached
+    Arguments:
+        sequence: VSE Sequence object
+        scene: scene that sequence is in
+        setting: String, the render preset name used for this sequence
+        transparent: Boolean, whether the sequence is rendered with transparency
+        curve_index: Dictionary returned by build_curve_index() for the scene
+        relative: Boolean, leave out where the sequence is in the timeline, so copies of a sequence at different frames have the same key
+        trim: Boolean, include the trim of the sequence, leave it out so a sequence has the same key however it is trimmed"""
+
+    quick_batch = scene.quick_batch
+    values = sequence_values(sequence, scene, quick_batch.batch_effects, curve_index, sequence.frame_start if relative else None, trim)
+    if values is None:
+        return ''
+    render = scene.render
+    values.append([setting, transparent, render.resolution_x, render.resolution_y, render.resolution_percentage, render.fps, render.fps_base])
+    if sequence.type == 'SOUND':
+        values.append(scene.render.ffmpeg.audio_mixrate)
+    else:
+        values.append(rna_values(render.image_settings))
+        values.append(rna_values(render.ffmpeg))
+    data = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+class RenderCache(object):
+    """Persistent store of rendered strips, indexed by a hash of everything that affects the rendered output.
+    Each entry is a folder named after its key, the index file lists the files in it, their size and when the entry was last used.
+    Batch scenes import links to the files in the render directory rather than the entries themselves, so entries can be evicted at any time.
+    Folders of renders that were never stored, because they failed or were cancelled, are removed by evict() once they are no longer in use.
+    Lookups only mark the index as changed, it is written by store() or flush()."""
+
+    def __init__(self, directory, max_size=0, verify=False):
+        """Arguments:
+            directory: String, folder to store the cache in
+            max_size: Integer, size in bytes that the cache is trimmed to after each new entry, 0 for no limit
+            verify: Boolean, check that every file of an entry still exists before using it"""
+
+        self.directory = directory
+        self.index_file = os.path.join(directory, 'index.json')
+        self.max_size = max_size
+        self.verify = verify
+        self.in_use = set()
+        self.dirty = False
+        self.entries = {}
+        if os.path.isfile(self.index_file):
+            try:
+                with open(self.index_file) as index_file:
+                    self.entries = json.load(index_file)
+            except ValueError:
+                self.entries = {}
+
+    def entry_directory(self, key):
+        """Returns the folder of the entry for a key, creating it for a render about to be stored in it.
+        The folder is marked as in use, so evict() doesn't remove it while the render is unfinished."""
+
+        self.in_use.add(key)
+        path = os.path.join(self.directory, key)
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        return path
+
+    def save(self):
+        temp_file = self.index_file+'.tmp'
+        with open(temp_file, 'w') as index_file:
+            json.dump(self.entries, index_file)
+        os.replace(temp_file, self.index_file)
+        self.dirty = False
+
+    def flush(self):
+        """Writes the index if lookups have changed it since it was last saved"""
+
+        if self.dirty:
+            self.save()
+
+    def remove(self, key):
+        shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
+        self.entries.pop(key, None)
+
+    def lookup(self, key):
+        """Returns the cache entry for a key, or None if there isn't a usable one
+        Arguments:
+            key: String, a hash returned by render_key()"""
+
+        if not key or key not in self.entries:
+            return None
+        entry = self.entries[key]
+        directory = os.path.join(self.directory, key)
+        if self.verify:
+            check_files = [entry['file']] + entry['files']
+        else:
+            check_files = [entry['file']]
+        for filename in check_files:
+            if not os.path.isfile(os.path.join(directory, filename)):
+                self.remove(key)
+                self.dirty = True
+                return None
+        entry['last_used'] = time.time()
+        self.in_use.add(key)
+        self.dirty = True
+        return entry
+
+    def store(self, key, kind, file, files):
+        """Adds a finished render to the cache, then removes the least recently used entries if the cache is over its size limit
+        Arguments:
+            key: String, a hash returned by render_key()
+            kind: String, the type of rendered file: 'MOVIE', 'IMAGE' or 'SOUND'
+            file: String, path of the main rendered file, inside entry_directory(key)
+            files: List of image sequence file names, may be empty"""
+
+        directory = os.path.join(self.directory, key)
+        size = 0
+        for filename in os.listdir(directory):
+            size = size + os.path.getsize(os.path.join(directory, filename))
+        self.entries[key] = {'kind': kind, 'file': os.path.basename(file), 'files': files, 'size': size, 'last_used': time.time()}
+        self.in_use.add(key)
+        self.evict()
+        self.save()
+
+    def evict(self):
+        """Removes entry folders that are not in the index, left by renders that never finished, then the least recently used entries
+        until the cache is within its size limit"""
+
+        try:
+            folders = [entry.name for entry in os.scandir(self.directory) if entry.is_dir()]
+        except OSError:
+            folders = []
+        for folder in folders:
+            if folder not in self.entries and folder not in self.in_use:
+                shutil.rmtree(os.path.join(self.directory, folder), ignore_errors=True)
+        if not self.max_size:
+            return
+        total = sum(entry['size'] for entry in self.entries.values())
+        for key in sorted(self.entries, key=lambda entry_key: self.entries[entry_key]['last_used']):
+            if total <= self.max_size:
+                break
+            if key in self.in_use:
+                continue
+            total = total - self.entries[key]['size']
+            self.remove(key)
+            self.dirty = True
+
+
+class FrameManifest(object):
+    """Record of the image sequence frames rendered for each sequence, so a sequence that was trimmed, extended or moved only renders
+    the frames it doesn't have yet.  Entries are indexed by a render key that leaves out the trim and position of the sequence,
+    and list each frame by its source frame, the number of frames it is from the start of the sequence."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.isfile(path):
+            try:
+                with open(path) as manifest_file:
+                    self.entries = json.load(manifest_file)
+            except ValueError:
+                self.entries = {}
+
+    def save(self):
+        temp_file = self.path+'.tmp'
+        with open(temp_file, 'w') as manifest_file:
+            json.dump(self.entries, manifest_file)
+        os.replace(temp_file, self.path)
+
+    def lookup(self, key):
+        """Returns the frames in the entry for a key that are still on disk and not empty.  The entry is kept, it is only replaced
+        once a new render of the sequence is finished, so a render that fails or is cancelled can still reuse the frames next time.
+        Arguments:
+            key: String, a hash returned by render_key() with relative=True and trim=False
+        Returns: Tuple of a dictionary of file paths by source frame, empty if there is no entry, the frame the sequence started on,
+            and the folder the frames are in"""
+
+        entry = self.entries.get(key)
+        if entry is None:
+            return {}, 0, ''
+        sizes = {}
+        try:
+            for directory_entry in os.scandir(entry['directory']):
+                try:
+                    sizes[directory_entry.name] = directory_entry.stat().st_size
+                except OSError:
+                    pass
+        except OSError:
+            return {}, 0, ''
+        frames = {}
+        for source_frame, filename in entry['frames'].items():
+            if sizes.get(filename):
+                frames[int(source_frame)] = os.path.join(entry['directory'], filename)
+        return frames, entry['origin'], entry['directory']
+
+    def remove(self, key):
+        """Removes the entry for a key, used when a render is about to replace the files the entry lists"""
+
+        if self.entries.pop(key, None) is not None:
+            self.save()
+
+    def store(self, key, directory, origin, frames):
+        """Records the frames of a finished render.  Frames already listed for the key in the same folder and position are kept,
+        since a render of a shorter trim of the sequence leaves them on disk.
+        Arguments:
+            key: String, a hash returned by render_key() with relative=True and trim=False
+            directory: String, folder the frames are in
+            origin: Integer, frame the sequence started on
+            frames: Dictionary of file names by source frame"""
+
+        entry = self.entries.get(key)
+        if entry is None or entry['directory'] != directory or entry['origin'] != origin:
+            entry = {'directory': directory, 'origin': origin, 'frames': {}}
+            self.entries[key] = entry
+        entry['frames'].update((str(source_frame), filename) for source_frame, filename in frames.items())
+        self.save()
+
+
+def render_preset(sequence, quick_batch):
+    """Returns the render preset name and transparency used for a sequence
+    Arguments:
+        sequence: VSE Sequence object
+        quick_batch: QuickBatchRenderSetting of the scene being batch rendered"""
+
+    if sequence.type == 'SOUND':
+        return quick_batch.audio_settings_menu, False
+    elif sequence.blend_type in ['OVER_DROP', 'ALPHA_OVER']:
+        return quick_batch.transparent_settings_menu, True
+    else:
+        return quick_batch.video_settings_menu, False
+
+
+def get_render_directory(scene):
+    """Returns the absolute folder that batch renders from the given scene will be written to
+    Arguments:
+        scene: Scene object that the batch render was started from"""
+
+    if scene.quick_batch.batch_render_directory:
+        path = scene.quick_batch.batch_render_directory
+    else:
+        path = os.path.split(scene.render.filepath)[0]
+    return os.path.abspath(bpy.path.abspath(path))
+
+
+def get_work_directory(scene):
+    """Returns the folder used for job descriptions and worker logs, creating it if needed
+    Arguments:
+        scene: Scene object that the batch render was started from"""
+
+    path = os.path.join(get_render_directory(scene), '.quickbatch')
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    return path
+
+
+def clean_work_directory(scene, keep=()):
+    """Removes the job descriptions, worker logs and saved files for workers from the work folder of a batch, see get_work_directory()
+    Arguments:
+        scene: Scene object that the batch render was started from
+        keep: Collection of paths to leave in place, such as the logs of jobs that failed"""
+
+    path = os.path.join(get_render_directory(scene), '.quickbatch')
+    if not os.path.isdir(path):
+        return
+    for entry in os.scandir(path):
+        if entry.path in keep or not entry.name.endswith(('.job.json', '.log', '.blend', '.blend1')):
+            continue
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+    try:
+        os.rmdir(path)
+    except OSError:
+        #logs of failed jobs are still in it
+        pass
+
+
+def audio_render_settings(audio_format):
+    """Returns the file extension, container and codec used for an audio render preset
+    Arguments:
+        audio_format: String, a value of the quick_batch setting 'audio_settings_menu'"""
+
+    if audio_format == 'FLAC':
+        return '.flac', 'FLAC', 'FLAC'
+    elif audio_format == 'MP3':
+        return '.mp3', 'MP3', 'MP3'
+    elif audio_format == 'OGG':
+        return '.ogg', 'OGG', 'VORBIS'
+    else:  #audio_format == 'WAV'
+        return '.wav', 'WAV', 'PCM'
+
+
+#File extensions of the output of each render preset, and of each image format and ffmpeg container for the 'DEFAULT' preset
+PRESET_EXTENSIONS = {
+    'AVIJPEG': ['.avi'],
+    'H264': ['.mp4'],
+    'JPEG': ['.jpg', '.jpeg'],
+    'PNG': ['.png'],
+    'TIFF': ['.tif', '.tiff'],
+    'EXR': ['.exr'],
+    'FLAC': ['.flac'],
+    'WAV': ['.wav'],
+    'OGG': ['.ogg'],
+    'MP3': ['.mp3']}
+FORMAT_EXTENSIONS = {
+    'AVI_JPEG': ['.avi'],
+    'AVI_RAW': ['.avi'],
+    'BMP': ['.bmp'],
+    'JPEG': ['.jpg', '.jpeg'],
+    'JPEG2000': ['.jp2'],
+    'PNG': ['.png'],
+    'TARGA': ['.tga'],
+    'TARGA_RAW': ['.tga'],
+    'TIFF': ['.tif', '.tiff'],
+    'OPEN_EXR': ['.exr'],
+    'OPEN_EXR_MULTILAYER': ['.exr'],
+    'DPX': ['.dpx'],
+    'CINEON': ['.cin'],
+    'HDR': ['.hdr']}
+FFMPEG_EXTENSIONS = {
+    'MPEG4': ['.mp4'],
+    'QUICKTIME': ['.mov'],
+    'MKV': ['.mkv'],
+    'AVI': ['.avi'],
+    'OGG': ['.ogv'],
+    'FLASH': ['.flv'],
+    'MPEG1': ['.mpg'],
+    'MPEG2': ['.mpg'],
+    'DV': ['.dv']}
+
+#Sequence settings that change how a sequence renders, a sequence can only be passed through if they are all at these values
+PASSTHROUGH_DEFAULTS = [
+    ('mute', False),
+    ('frame_offset_start', 0),
+    ('frame_offset_end', 0),
+    ('frame_still_start', 0),
+    ('frame_still_end', 0),
+    ('animation_offset_start', 0),
+    ('animation_offset_end', 0),
+    ('use_reverse_frames', False),
+    ('use_flip_x', False),
+    ('use_flip_y', False),
+    ('use_crop', False),
+    ('use_translation', False),
+    ('use_deinterlace', False),
+    ('use_float', False),
+    ('color_saturation', 1.0),
+    ('color_multiply', 1.0),
+    ('strobe', 1.0),
+    ('blend_alpha', 1.0),
+    ('volume', 1.0),
+    ('pitch', 1.0),
+    ('pan', 0.0)]
+
+
+def preset_extensions(setting, scene):
+    """Returns a list of the file extensions a render preset writes
+    Arguments:
+        setting: String, render preset name
+        scene: Scene object, the settings of this scene are used for the 'DEFAULT' preset"""
+
+    if setting != 'DEFAULT':
+        return PRESET_EXTENSIONS.get(setting, [])
+    file_format = scene.render.image_settings.file_format
+    if file_format in ['H264', 'FFMPEG']:
+        return FFMPEG_EXTENSIONS.get(scene.render.ffmpeg.format, [])
+    return FORMAT_EXTENSIONS.get(file_format, [])
+
+
+def passthrough_files(sequence, scene, setting, curve_index=None):
+    """Returns the source files of a sequence if it can be imported as it is instead of being rendered, or None if it needs rendering.
+    This is a movie, image or sound sequence with no modifiers, animation, trimming or adjustments, with a source that is already
+    in the format of the render preset, and for images and movies at the render size and frame rate.
+    Arguments:
+        sequence: VSE Sequence object
+        scene: scene that sequence is in
+        setting: String, render preset used for the sequence
+        curve_index: Dictionary returned by build_curve_index() for the scene"""
+
+    if sequence.type not in ['MOVIE', 'IMAGE', 'SOUND']:
+        return None
+    if len(sequence.modifiers) > 0 or sequence_fcurves(sequence, scene, curve_index):
+        return None
+    for attribute, default in PASSTHROUGH_DEFAULTS:
+        if getattr(sequence, attribute, default) != default:
+            return None
+    if sequence.type == 'SOUND':
+        files = [sequence.sound.filepath]
+    else:
+        render = scene.render
+        element = sequence.elements[0] if len(sequence.elements) > 0 else None
+        width = int(render.resolution_x * render.resolution_percentage / 100)
+        height = int(render.resolution_y * render.resolution_percentage / 100)
+        if element is None or getattr(element, 'orig_width', 0) != width or getattr(element, 'orig_height', 0) != height:
+            return None
+        if sequence.type == 'MOVIE':
+            fps = getattr(sequence, 'fps', None)
+            if fps is None or abs(fps - render.fps / render.fps_base) > 0.001:
+                return None
+            files = [sequence.filepath]
+        else:
+            if len(sequence.elements) != sequence.frame_final_duration:
+                return None
+            files = [os.path.join(sequence.directory, image.filename) for image in sequence.elements]
+    extensions = preset_extensions(setting, scene)
+    files = [os.path.abspath(bpy.path.abspath(file)) for file in files]
+    for file in files:
+        if os.path.splitext(file)[1].lower() not in extensions or not os.path.isfile(file):
+            return None
+    return files
+
+
+#Linux ioctl that makes a copy-on-write clone of a file, on filesystems that support it such as btrfs and xfs
+FICLONE = 0x40049409
+
+
+def reflink_file(source, destination):
+    """Makes a copy-on-write clone of a file, only supported on Linux
+    Arguments:
+        source: String, file to clone
+        destination: String, path of the clone
+    Returns: True if the clone was made"""
+
+    if fcntl is None or not sys.platform.startswith('linux'):
+        return False
+    try:
+        with open(source, 'rb') as source_file, open(destination, 'wb') as destination_file:
+            fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+        return True
+    except OSError:
+        if os.path.exists(destination):
+            os.remove(destination)
+        return False
+
+
+def link_file(source, destination):
+    """Places a file at a new path without copying its data when possible: a hard link, then a copy-on-write clone, then a copy
+    Arguments:
+        source: String, file to link
+        destination: String, path to place it at, replaced if it exists
+    Returns: String, how the file was placed: 'hardlink', 'reflink' or 'copy'"""
+
+    if os.path.lexists(destination):
+        if os.path.exists(destination) and os.path.samefile(source, destination):
+            return 'hardlink'
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+        return 'hardlink'
+    except (OSError, AttributeError):
+        pass
+    if reflink_file(source, destination):
+        return 'reflink'
+    shutil.copy2(source, destination)
+    return 'copy'
+
+
+def link_outputs(job, directory):
+    """Links the files of a finished job into another folder, and points the job at the links
+    Arguments:
+        job: RenderJob object with kind, file and files set
+        directory: String, folder to link the files into"""
+
+    for file in output_files(job):
+        link_file(file, os.path.join(directory, os.path.basename(file)))
+    job.file = os.path.join(directory, os.path.basename(job.file))
+
+
+def get_scratch_directory(scene, directory):
+    """Returns the local folder that renders meant for a folder are written to before being moved there, creating it if needed
+    Arguments:
+        scene: Scene object that the batch render was started from
+        directory: String, final folder of the render"""
+
+    if scene.quick_batch.batch_scratch_directory:
+        path = os.path.abspath(bpy.path.abspath(scene.quick_batch.batch_scratch_directory))
+    else:
+        path = os.path.join(tempfile.gettempdir(), 'quickbatchrender')
+    #each final folder gets its own scratch folder, so renders of strips with the same name from different batches do not collide
+    path = os.path.join(path, hashlib.sha1(directory.encode('utf-8')).hexdigest()[:16])
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    return path
+
+
+TRANSFER_BLOCK_SIZE = 1024 * 1024
+
+
+def file_checksum(path):
+    checksum = hashlib.sha1()
+    with open(path, 'rb') as checked_file:
+        for block in iter(lambda: checked_file.read(TRANSFER_BLOCK_SIZE), b''):
+            checksum.update(block)
+    return checksum.hexdigest()
+
+
+def transfer_file(source, destination):
+    """Copies a file, checks the copy against a checksum of the source taken while copying, then removes the source.
+    The copy is written next to the destination and renamed once it is verified, so the destination is never a partial file.
+    Arguments:
+        source: String, file to move
+        destination: String, path to move it to, replaced if it exists"""
+
+    partial = destination+'.part'
+    checksum = hashlib.sha1()
+    with open(source, 'rb') as source_file, open(partial, 'wb') as destination_file:
+        for block in iter(lambda: source_file.read(TRANSFER_BLOCK_SIZE), b''):
+            checksum.update(block)
+            destination_file.write(block)
+        destination_file.flush()
+        os.fsync(destination_file.fileno())
+    if file_checksum(partial) != checksum.hexdigest():
+        os.remove(partial)
+        raise OSError('checksum of '+destination+' does not match '+source)
+    os.replace(partial, destination)
+    os.remove(source)
+
+
+def transfer_files(files, directory, attempts=2):
+    """Moves rendered files from a scratch folder into their final folder, this is run on a transfer thread.
+    Files on the same drive are renamed, others are copied and verified by transfer_file().
+    Arguments:
+        files: List of file paths to move
+        directory: String, folder to move them into
+        attempts: Integer, number of times a file is copied before giving up on it
+    Returns: Float, seconds spent moving the files"""
+
+    start = time.perf_counter()
+    same_drive = bool(files) and os.stat(files[0]).st_dev == os.stat(directory).st_dev
+    for file in files:
+        destination = os.path.join(directory, os.path.basename(file))
+        if same_drive:
+            os.replace(file, destination)
+            continue
+        for attempt in range(attempts):
+            try:
+                transfer_file(file, destination)
+                break
+            except OSError:
+                if attempt == attempts - 1:
+                    raise
+    return time.perf_counter() - start
+
+
+#Effect strips that can be rendered from their inputs alone, adjustment and multicam strips use the channels below them instead
+RENDER_EFFECTS = ['CROSS', 'ADD', 'SUBTRACT', 'ALPHA_OVER', 'ALPHA_UNDER', 'GAMMA_CROSS', 'MULTIPLY', 'OVER_DROP', 'WIPE', 'GLOW',
+                  'TRANSFORM', 'COLOR', 'SPEED', 'GAUSSIAN_BLUR', 'TEXT', 'COLORMIX']
+
+
+def build_render_queue(sequence_editor, quick_batch):
+    """Returns the list of sequences a batch render will process, in the order they should be rendered
+    Arguments:
+        sequence_editor: SequenceEditor of the batch scene
+        quick_batch: QuickBatchRenderSetting of the batch scene
+    Returns: Tuple of the list of sequences, the number of video frames, and the number of audio frames"""
+
+    if quick_batch.batch_meta in ['SUBSTRIPS', 'TREE']:
+        old_sequences = sequence_editor.sequences_all
+    else:
+        old_sequences = sequence_editor.sequences
+
+    total_frames = 0
+    audio_frames = 0
+    renders = []
+    for sequence in old_sequences:
+        if (quick_batch.batch_selected and sequence.select) or not quick_batch.batch_selected:
+            if sequence.type == 'MOVIE' or sequence.type == 'IMAGE' or sequence.type == 'MOVIECLIP':
+                #standard video or image sequence
+                renders.append(sequence)
+                total_frames = total_frames + sequence.frame_final_duration
+            elif sequence.type == 'SOUND':
+                #audio sequence
+                if quick_batch.batch_audio:
+                    renders.append(sequence)
+                    audio_frames = audio_frames + sequence.frame_final_duration
+            elif sequence.type == 'META':
+                #meta sequence, in a tree it is rendered after the sequences inside it
+                if quick_batch.batch_meta == 'SINGLESTRIP' or (quick_batch.batch_meta == 'TREE' and quick_batch.batch_meta_composite):
+                    renders.append(sequence)
+                    total_frames = total_frames + sequence.frame_final_duration
+            elif sequence.type in RENDER_EFFECTS:
+                #effect sequence, rendered after its inputs
+                if quick_batch.batch_effect_strips:
+                    renders.append(sequence)
+                    total_frames = total_frames + sequence.frame_final_duration
+            else:
+                #other sequence type, not handled
+                pass
+    return dependency_order(renders), total_frames, audio_frames
+
+
+def group_duplicates(sequences, scene, curve_index=None):
+    """Finds sequences that render to the same output wherever they are in the timeline, such as a clip used several times
+    or a strip duplicated on another channel, so each group is only rendered once
+    Arguments:
+        sequences: List of VSE Sequence objects to render, in render order
+        scene: scene that the sequences are in
+        curve_index: Dictionary returned by build_curve_index() for the scene
+    Returns: Tuple of the list of sequences to render, in the same order, and a dictionary of the duplicates of each of them by name"""
+
+    renders = []
+    duplicates = {}
+    first = {}
+    for sequence in sequences:
+        setting, transparent = render_preset(sequence, scene.quick_batch)
+        key = render_key(sequence, scene, setting, transparent, curve_index, relative=True)
+        if key and key in first:
+            duplicates[first[key].name].append(sequence)
+            continue
+        if key:
+            first[key] = sequence
+        renders.append(sequence)
+        duplicates[sequence.name] = []
+    return renders, duplicates
+
+
+class RenderJob(object):
+    """Describes the render of one sequence: the temporary scene it is rendered from and the file it is rendered to"""
+
+    def __init__(self, sequence, scene, key=''):
+        self.sequence = sequence
+        self.sequence_name = sequence.name
+        self.scene = scene
+        self.scene_name = scene.name if scene else ''
+        self.audio = sequence.type == 'SOUND'
+        self.key = key
+        self.kind = ''
+        self.file = ''
+        self.files = []
+        self.container = ''
+        self.codec = ''
+        self.frame_start = 0
+        self.frame_end = 0
+        self.parent = None
+        self.chunks = []
+        self.remaining_chunks = 0
+        self.attempts = 0
+        self.frames = sequence.frame_final_duration
+        self.sequence_type = sequence.type
+        self.preset = ''
+        self.cached = False
+        self.passthrough = ''
+        self.duplicates = []
+        self.final_directory = ''
+        self.verified = None
+        self.ranges = []
+        self.frame_key = ''
+        self.frame_origin = 0
+        self.reused_frames = 0
+        self.placed_files = []
+        self.complexity = 1.0
+        self.timings = {}
+        self.render_start = None
+        self.render_end = None
+        self.job_file = ''
+        self.log_file = ''
+        self.blend_file = ''
+        self.returncode = None
+
+    def name(self):
+        """Returns a name for this job's files, chunks of a strip are named after their frame range"""
+
+        name = bpy.path.clean_name(self.sequence_name)
+        if self.parent:
+            name = name+'_'+str(self.frame_start)+'-'+str(self.frame_end)
+        return name
+
+    def is_movie(self):
+        return not self.audio and self.scene.render.image_settings.file_format in MOVIE_FORMATS
+
+    def split(self, chunk_size):
+        """Splits the frame ranges of this job into jobs of no more than chunk_size frames, all rendered from the same temporary scene.
+        Image sequence chunks write into the same sequence, movie chunks are each written to their own file to be joined afterwards.
+        Arguments:
+            chunk_size: Integer, maximum number of frames in each chunk
+        Returns: List of RenderJob objects"""
+
+        movie = self.is_movie()
+        self.chunks = []
+        frame_ranges = []
+        for range_start, range_end in self.ranges:
+            frame_ranges.extend(split_frames(range_start, range_end, chunk_size))
+        for frame_start, frame_end in frame_ranges:
+            chunk = RenderJob(self.sequence, self.scene, key=self.key)
+            chunk.parent = self
+            chunk.frame_start = frame_start
+            chunk.frame_end = frame_end
+            if movie:
+                chunk.file = movie_path(self.scene, frame_start, frame_end)
+            else:
+                chunk.file = self.file
+            self.chunks.append(chunk)
+        self.remaining_chunks = len(self.chunks)
+        return self.chunks
+
+    def description(self):
+        """Returns a dictionary describing this job, this is written to disk for a worker process to read"""
+
+        return {
+            'sequence': self.sequence_name,
+            'scene': self.scene_name,
+            'audio': self.audio,
+            'file': self.file,
+            'frame_start': self.frame_start,
+            'frame_end': self.frame_end,
+            'container': self.container,
+            'codec': self.codec}
+
+    def read_output(self):
+        """Reads the type of file and list of image sequence frames that the temporary scene renders to.
+        The first frame is the job file, the rest are listed in files, up to and including frame_end."""
+
+        if self.audio:
+            self.kind = 'SOUND'
+        elif self.scene.render.image_settings.file_format in MOVIE_FORMATS:
+            self.kind = 'MOVIE'
+        else:
+            self.kind = 'IMAGE'
+            self.files = []
+            for frame in range(self.frame_start + 1, self.frame_end + 1):
+                self.files.append(os.path.split(self.scene.render.frame_path(frame=frame))[1])
+
+    def write(self, directory):
+        """Writes the job description to a json file in the given folder
+        Arguments:
+            directory: String, folder to write the job file to"""
+
+        #clean_name() maps different sequence names to the same name, so the original name is hashed in to keep files apart
+        name = self.name()+'_'+hashlib.sha1(self.sequence_name.encode('utf-8')).hexdigest()[:8]
+        self.job_file = os.path.join(directory, name+'.job.json')
+        self.log_file = os.path.join(directory, name+'.log')
+        with open(self.job_file, 'w') as job_file:
+            json.dump(self.description(), job_file, indent=4)
+
+
+def output_files(job):
+    """Returns the paths of every file a finished job rendered
+    Arguments:
+        job: RenderJob object with kind, file and files set"""
+
+    if job.kind == 'IMAGE':
+        directory = os.path.dirname(job.file)
+        return [job.file] + [os.path.join(directory, filename) for filename in job.files]
+    return [job.file]
+
+
+def output_exists(job):
+    """Checks that all the files a finished job rendered are on disk and not empty
+    Arguments:
+        job: RenderJob object with kind, file and files set"""
+
+    for file in output_files(job):
+        if not os.path.isfile(file) or os.path.getsize(file) == 0:
+            return False
+    return True
+
+
+#Bytes that files of each extension start with, as a list of (offset, signature) pairs, any one of which may match
+FILE_SIGNATURES = {
+    '.png': [(0, b'\x89PNG\r\n\x1a\n')],
+    '.jpg': [(0, b'\xff\xd8\xff')],
+    '.jpeg': [(0, b'\xff\xd8\xff')],
+    '.tif': [(0, b'II*\x00'), (0, b'MM\x00*')],
+    '.tiff': [(0, b'II*\x00'), (0, b'MM\x00*')],
+    '.exr': [(0, b'v/1\x01')],
+    '.bmp': [(0, b'BM')],
+    '.dpx': [(0, b'SDPX'), (0, b'XPDS')],
+    '.cin': [(0, b'\x80\x2a\x5f\xd7'), (0, b'\xd7\x5f\x2a\x80')],
+    '.hdr': [(0, b'#?')],
+    '.jp2': [(4, b'jP  '), (0, b'\xff\x4f\xff\x51')],
+    '.avi': [(0, b'RIFF')],
+    '.mp4': [(4, b'ftyp')],
+    '.mov': [(4, b'ftyp'), (4, b'moov'), (4, b'mdat'), (4, b'wide'), (4, b'free')],
+    '.mkv': [(0, b'\x1aE\xdf\xa3')],
+    '.ogv': [(0, b'OggS')],
+    '.flac': [(0, b'fLaC')],
+    '.wav': [(0, b'RIFF')],
+    '.ogg': [(0, b'OggS')]}
+
+
+def header_matches(path):
+    """Checks that a file starts with the signature of its format, files with an extension not in FILE_SIGNATURES always match
+    Arguments:
+        path: String, file to check"""
+
+    signatures = FILE_SIGNATURES.get(os.path.splitext(path)[1].lower())
+    if not signatures:
+        return True
+    with open(path, 'rb') as checked_file:
+        header = checked_file.read(16)
+    for offset, signature in signatures:
+        if header[offset:offset + len(signature)] == signature:
+            return True
+    return False
+
+
+def contiguous_ranges(frames):
+    """Returns a list of (start, end) ranges of consecutive frames, both included, covering a sorted list of frame numbers"""
+
+    ranges = []
+    for frame in frames:
+        if ranges and frame == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], frame)
+        else:
+            ranges.append((frame, frame))
+    return ranges
+
+
+def frame_ranges(frames):
+    """Returns a short string listing a sorted list of frame numbers as ranges, such as '12-15, 20'"""
+
+    return ', '.join(str(start) if start == end else str(start)+'-'+str(end) for start, end in contiguous_ranges(frames))
+
+
+def verify_output(kind, files, frame_start=0):
+    """Checks the files of a finished render using one listing of each folder they are in, instead of looking up each frame:
+    that every file is there and not empty, and that the first and last files start with the signature of their format.
+    Arguments:
+        kind: String, the type of rendered file: 'MOVIE', 'IMAGE' or 'SOUND'
+        files: List of the paths the render should have written, in frame order
+        frame_start: Integer, frame number of the first file, used to describe missing image sequence frames
+    Returns: List of strings describing each problem found, empty if the render is good"""
+
+    sizes = {}
+    for directory in sorted(set(os.path.dirname(file) for file in files)):
+        try:
+            for entry in os.scandir(directory):
+                try:
+                    if entry.is_file():
+                        sizes[os.path.join(directory, entry.name)] = entry.stat().st_size
+                except OSError:
+                    #other renders in the folder may be moved or removed while it is listed
+                    pass
+        except OSError as error:
+            return ['could not read '+directory+': '+str(error)]
+    names = [os.path.basename(file) for file in files]
+    missing = [frame_start + index for index, file in enumerate(files) if file not in sizes]
+    empty = [frame_start + index for index, file in enumerate(files) if sizes.get(file) == 0]
+    problems = []
+    if kind == 'IMAGE':
+        if missing:
+            problems.append(str(len(names) - len(missing))+' of '+str(len(names))+' frames were rendered, missing frames '+frame_ranges(missing))
+        if empty:
+            problems.append('empty frames '+frame_ranges(empty))
+    elif missing:
+        problems.append(names[0]+' was not rendered')
+    elif empty:
+        problems.append(names[0]+' is empty')
+    for file in sorted(set([files[0], files[-1]])):
+        if sizes.get(file):
+            try:
+                if not header_matches(file):
+                    problems.append(os.path.basename(file)+' is not a valid '+os.path.splitext(file)[1]+' file')
+            except OSError as error:
+                problems.append('could not read '+file+': '+str(error))
+    return problems
+
+
+def check_output(kind, files, frame_start=0, final_directory='', placed=()):
+    """Verifies the files of a finished render, then moves them to their final folder if they were rendered to a scratch folder.
+    This is run on an output thread, so it only works with file paths and does not touch any Blender data.
+    Arguments:
+        kind: String, the type of rendered file: 'MOVIE', 'IMAGE' or 'SOUND'
+        files: List of the paths the render should have written, see verify_output()
+        frame_start: Integer, frame number of the first file
+        final_directory: String, folder to move the files to once they are verified, blank if they are already there
+        placed: Collection of the names of files that are already in the final folder, such as reused frames, they are not moved
+    Returns: Tuple of the list of problems found by verify_output(), and a dictionary of the seconds spent verifying and moving the files"""
+
+    start = time.perf_counter()
+    if final_directory and placed:
+        files = [os.path.join(final_directory, os.path.basename(file)) if os.path.basename(file) in placed else file for file in files]
+    problems = verify_output(kind, files, frame_start)
+    timings = {'verify': time.perf_counter() - start}
+    if not problems and final_directory:
+        timings['transfer'] = transfer_files([file for file in files if os.path.dirname(file) != final_directory], final_directory)
+    return problems, timings
+
+
+def append_json_line(path, record, sync=False):
+    """Appends a record to a json lines file
+    Arguments:
+        path: String, file to append to
+        record: Dictionary to write as one line
+        sync: Boolean, wait until the line is written to disk"""
+
+    with open(path, 'a') as json_file:
+        json_file.write(json.dumps(record)+'\n')
+        if sync:
+            json_file.flush()
+            os.fsync(json_file.fileno())
+
+
+def format_duration(seconds):
+    """Returns a short human readable string for a number of seconds, such as '1h 5m' or '42s'"""
+
+    seconds = int(round(seconds))
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return str(hours)+'h '+str(minutes)+'m'
+    elif minutes:
+        return str(minutes)+'m '+str(seconds)+'s'
+    return str(seconds)+'s'
+
+
+class BatchJournal(object):
+    """Append-only record of a batch render, written as one json object per line so that an interrupted batch can be resumed.
+    Each record has an 'event': 'start' or 'resume' for a batch, 'queued' and 'rendering' for each sequence, 'completed' when a render is done,
+    and 'finished' or 'cancelled' at the end."""
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.isfile(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb+') as journal_file:
+                journal_file.seek(-1, os.SEEK_END)
+                if journal_file.read(1) != b'\n':
+                    #end a line that was left incomplete by a crash
+                    journal_file.write(b'\n')
+
+    def write(self, event, **data):
+        data['event'] = event
+        data['time'] = time.time()
+        append_json_line(self.path, data, sync=True)
+
+    def read(self):
+        """Reads the records of the most recent batch in the journal
+        Returns: Dictionary with the 'start' record, the name of the last 'batch_scene', the list of 'queued' sequence names,
+            a dictionary of 'completed' records by sequence name and the 'ended' event, or None if there is no batch in the journal"""
+
+        if not os.path.isfile(self.path):
+            return None
+        batch = None
+        with open(self.path) as journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    #the last line may be incomplete if Blender crashed while writing it
+                    continue
+                event = record.get('event')
+                if event == 'start':
+                    batch = {'start': record, 'batch_scene': record['batch_scene'], 'queued': [], 'completed': {}, 'ended': ''}
+                elif batch is None:
+                    continue
+                elif event == 'resume':
+                    batch['batch_scene'] = record['batch_scene']
+                    batch['ended'] = ''
+                elif event == 'queued':
+                    batch['queued'].append(record['sequence'])
+                elif event == 'completed':
+                    if record['verified']:
+                        batch['completed'][record['sequence']] = record
+                elif event in ['finished', 'cancelled']:
+                    batch['ended'] = event
+        return batch
+
+
+def get_journal(scene):
+    """Returns the BatchJournal for batch renders from a scene, it is kept in the render directory
+    Arguments:
+        scene: Scene object that the batch render was started from"""
+
+    directory = get_render_directory(scene)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    return BatchJournal(os.path.join(directory, 'batch_journal.jsonl'))
+
+
+def output_size(job):
+    """Returns the total size in bytes of the files a finished job rendered
+    Arguments:
+        job: RenderJob object with kind, file and files set"""
+
+    size = 0
+    for file in output_files(job):
+        if os.path.isfile(file):
+            size = size + os.path.getsize(file)
+    return size
+
+
+class BatchProgress(object):
+    """Tracks the throughput of a batch render to estimate the time remaining.
+    Video and audio are measured separately since audio renders much faster, and the rate work is done at overall
+    (more than one job at a time when rendering in the background) is measured against the time spent in each render."""
+
+    def __init__(self, video_frames, audio_frames):
+        self.start = time.perf_counter()
+        self.video_frames = video_frames
+        self.audio_frames = audio_frames
+        self.done_video_frames = 0
+        self.done_audio_frames = 0
+        self.video_seconds = 0.0
+        self.audio_seconds = 0.0
+
+    def add(self, job):
+        """Records a finished job that was rendered"""
+
+        render_time = job.timings.get('render', 0.0)
+        if job.audio:
+            self.done_audio_frames = self.done_audio_frames + job.frames
+            self.audio_seconds = self.audio_seconds + render_time
+        else:
+            self.done_video_frames = self.done_video_frames + job.frames
+            self.video_seconds = self.video_seconds + render_time
+
+    def add_cached(self, job):
+        """Records a job that didn't need rendering, it is removed from the frames still to render"""
+
+        if job.audio:
+            self.audio_frames = self.audio_frames - job.frames
+        else:
+            self.video_frames = self.video_frames - job.frames
+
+    def remaining(self):
+        """Returns the estimated number of seconds left in the batch, or None if nothing has been measured yet"""
+
+        if not self.video_seconds and not self.audio_seconds:
+            return None
+        video_rate = self.video_seconds / self.done_video_frames if self.done_video_frames else None
+        audio_rate = self.audio_seconds / self.done_audio_frames if self.done_audio_frames else None
+        if video_rate is None:
+            video_rate = audio_rate
+        if audio_rate is None:
+            audio_rate = video_rate
+        work = max(0, self.video_frames - self.done_video_frames) * video_rate + max(0, self.audio_frames - self.done_audio_frames) * audio_rate
+        elapsed = time.perf_counter() - self.start
+        concurrency = max(1.0, (self.video_seconds + self.audio_seconds) / elapsed) if elapsed > 0 else 1.0
+        return work / concurrency
+
+    def status(self, finished, total):
+        """Returns a string describing the batch progress for the panel"""
+
+        status = str(finished)+' of '+str(total)+' strips'
+        remaining = self.remaining()
+        if remaining is not None:
+            status = status+', about '+format_duration(remaining)+' left'
+        return status
+
+
+#Assumed when no earlier batch has measured a preset: render seconds per megapixel frame of a strip with no modifiers or animation,
+#and render seconds per frame of audio
+DEFAULT_VIDEO_SECONDS = 0.05
+DEFAULT_AUDIO_SECONDS = 0.002
+
+#Assumed output bytes per megapixel frame of each render preset, and of the image formats the 'DEFAULT' preset may use
+PRESET_BYTES = {
+    'AVIJPEG': 150000,
+    'AVI_JPEG': 150000,
+    'H264': 30000,
+    'FFMPEG': 30000,
+    'JPEG': 200000,
+    'PNG': 1500000,
+    'TIFF': 3000000,
+    'EXR': 4000000,
+    'OPEN_EXR': 4000000}
+DEFAULT_BYTES = 2000000
+
+#Assumed size of each audio preset compared to uncompressed 16 bit stereo
+AUDIO_COMPRESSION = {'WAV': 1.0, 'FLAC': 0.6, 'OGG': 0.1, 'MP3': 0.1}
+
+
+def sequence_complexity(sequence, scene, include_modifiers, curve_index=None):
+    """Returns how much work a sequence is to render per frame compared to a plain strip.
+    Each modifier and animated property adds to it, and a meta sequence adds up the sequences inside it.
+    Arguments:
+        sequence: VSE Sequence object
+        scene: scene that sequence is in
+        include_modifiers: Boolean, whether modifiers will be rendered into the output
+        curve_index: Dictionary returned by build_curve_index() for the scene"""
+
+    complexity = 1.0
+    if include_modifiers:
+        complexity = complexity + 0.5 * len(sequence.modifiers)
+    complexity = complexity + 0.1 * len(sequence_fcurves(sequence, scene, curve_index))
+    for sub_sequence in getattr(sequence, 'sequences', []):
+        complexity = complexity + sequence_complexity(sub_sequence, scene, True, curve_index)
+    return complexity
+
+
+def read_metrics(path):
+    """Returns the records of a metrics log written by earlier batches, lines that can't be read are skipped
+    Arguments:
+        path: String, batch_metrics.jsonl file"""
+
+    records = []
+    if not os.path.isfile(path):
+        return records
+    with open(path) as metrics_file:
+        for line in metrics_file:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def megapixels(resolution):
+    """Returns the size in megapixels of a rendered frame
+    Arguments:
+        resolution: List of resolution_x, resolution_y and resolution_percentage"""
+
+    scale = resolution[2] / 100.0
+    return resolution[0] * scale * resolution[1] * scale / 1000000.0
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+class RenderEstimator(object):
+    """Estimates the render time and output size of strips, calibrated from the metrics logged by earlier batches.
+    Video is measured per megapixel frame, with render time also divided by the complexity of the strip, and audio per frame.
+    Each preset uses the median of its earlier renders.  A preset that hasn't been rendered yet takes its render time from the median
+    of the other presets, and its output size from PRESET_BYTES."""
+
+    def __init__(self, records):
+        """Arguments:
+            records: List of dictionaries returned by read_metrics()"""
+
+        seconds = {}
+        sizes = {}
+        self.renders = 0
+        for record in records:
+            if record.get('record') != 'strip' or record.get('passthrough') or not record.get('frames'):
+                continue
+            audio = record.get('type') == 'SOUND'
+            size = 1.0 if audio else megapixels(record['resolution'])
+            if not size:
+                continue
+            key = (record['preset'], audio)
+            if record.get('bytes'):
+                sizes.setdefault(key, []).append(record['bytes'] / (record['frames'] * size))
+            rendered_frames = record['frames'] - record.get('reused_frames', 0)
+            render_time = record.get('phases', {}).get('render')
+            if record.get('cached') or rendered_frames <= 0 or not render_time:
+                continue
+            seconds.setdefault(key, []).append(render_time / (rendered_frames * size * record.get('complexity', 1.0)))
+            self.renders = self.renders + 1
+        self.seconds = dict((key, median(values)) for key, values in seconds.items())
+        self.sizes = dict((key, median(values)) for key, values in sizes.items())
+        self.fallback_seconds = {False: DEFAULT_VIDEO_SECONDS, True: DEFAULT_AUDIO_SECONDS}
+        for audio in [False, True]:
+            measured = [value for key, value in self.seconds.items() if key[1] == audio]
+            if measured:
+                self.fallback_seconds[audio] = median(measured)
+
+    def estimate(self, sequence, scene, preset, complexity=1.0):
+        """Returns a tuple of the estimated render seconds and output bytes of a sequence
+        Arguments:
+            sequence: VSE Sequence object
+            scene: scene that sequence is in
+            preset: String, render preset name used for the sequence
+            complexity: Float returned by sequence_complexity()"""
+
+        audio = sequence.type == 'SOUND'
+        render = scene.render
+        frames = sequence.frame_final_duration
+        if audio:
+            size = 1.0
+        else:
+            size = megapixels([render.resolution_x, render.resolution_y, render.resolution_percentage])
+        key = (preset, audio)
+        rate = self.seconds.get(key, self.fallback_seconds[audio])
+        frame_bytes = self.sizes.get(key)
+        if frame_bytes is None:
+            if audio:
+                frame_bytes = render.ffmpeg.audio_mixrate * 4.0 * render.fps_base / render.fps * AUDIO_COMPRESSION.get(preset, 1.0)
+            elif preset == 'DEFAULT':
+                frame_bytes = PRESET_BYTES.get(render.image_settings.file_format, DEFAULT_BYTES)
+            else:
+                frame_bytes = PRESET_BYTES.get(preset, DEFAULT_BYTES)
+        return frames * size * complexity * rate, frames * size * frame_bytes
+
+
+def schedule_jobs(jobs, workers, longest_first=True):
+    """Simulates rendering jobs on a number of workers, each worker takes the next job that can start as soon as it is free.
+    A job can only start once every job it depends on has finished.
+    Arguments:
+        jobs: List of dictionaries with the 'name', estimated 'seconds', and 'after', a list of names of jobs that have to finish first.
+            The chunks of a strip are given as separate jobs with the same name.
+        workers: Integer, number of jobs rendered at once
+        longest_first: Boolean, take the longest job that can start, instead of the first one in the list
+    Returns: Tuple of the list of job names in the order they start, and the estimated wall time in seconds"""
+
+    if longest_first:
+        waiting = sorted(jobs, key=lambda job: -job['seconds'])
+    else:
+        waiting = list(jobs)
+    remaining = {}
+    for job in jobs:
+        remaining[job['name']] = remaining.get(job['name'], 0) + 1
+    finished = {}
+    free = [0.0] * max(1, workers)
+    order = []
+    while waiting:
+        worker = free.index(min(free))
+        choice = None
+        choice_ready = None
+        for job in waiting:
+            if any(remaining.get(name) for name in job['after']):
+                continue
+            ready = max([finished.get(name, 0.0) for name in job['after']] + [0.0])
+            if ready <= free[worker]:
+                choice = job
+                choice_ready = ready
+                break
+            if choice is None or ready < choice_ready:
+                choice = job
+                choice_ready = ready
+        if choice is None:
+            choice = waiting[0]
+            choice_ready = 0.0
+        waiting.remove(choice)
+        end = max(free[worker], choice_ready) + choice['seconds']
+        free[worker] = end
+        name = choice['name']
+        remaining[name] = remaining[name] - 1
+        finished[name] = max(finished.get(name, 0.0), end)
+        if name not in order:
+            order.append(name)
+    return order, max(free)
+
+
+def free_space(path):
+    """Returns the free bytes on the drive a folder is on, the folder doesn't need to exist yet
+    Arguments:
+        path: String, folder"""
+
+    path = os.path.abspath(path)
+    while not os.path.isdir(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return shutil.disk_usage(path).free
+
+
+def format_size(size):
+    """Returns a short human readable string for a number of bytes, such as '1.5 GB'"""
+
+    units = ['B', 'KB', 'MB', 'GB', 'TB']
+    unit = 0
+    while size >= 1024 and unit < len(units) - 1:
+        size = size / 1024.0
+        unit = unit + 1
+    return '{:.1f} {}'.format(size, units[unit])
+
+
+def plan_batch(scene):
+    """Works out what a batch render of a scene would do, without rendering anything or creating the batch scene.
+    Strips are queued the same way as a batch render, checked for being linked, found in the render cache or duplicates of another strip,
+    and the rest have their render time and output size estimated from the metrics of earlier batches.
+    Arguments:
+        scene: Scene object to plan a batch render of
+    Returns: Dictionary with a 'jobs' list of the strips in queue order, the proposed 'order' to render them in,
+        the estimated total 'render_seconds', 'wall_seconds' with the jobs rendered longest first, 'queue_seconds' in queue order,
+        'bytes' to be written, the 'free_bytes' in the render directory and whether there is 'enough_space'"""
+
+    quick_batch = scene.quick_batch
+    render_directory = get_render_directory(scene)
+    estimator = RenderEstimator(read_metrics(os.path.join(render_directory, 'batch_metrics.jsonl')))
+    curve_index = build_curve_index(scene)
+    renders = build_render_queue(scene.sequence_editor, quick_batch)[0]
+    if quick_batch.batch_deduplicate:
+        renders, duplicates = group_duplicates(renders, scene, curve_index)
+    else:
+        duplicates = {}
+    if quick_batch.batch_cache:
+        cache = RenderCache(os.path.join(render_directory, 'cache'))
+    else:
+        cache = None
+
+    jobs = []
+    for sequence in renders:
+        preset, transparent = render_preset(sequence, quick_batch)
+        job = {
+            'name': sequence.name,
+            'type': sequence.type,
+            'frames': sequence.frame_final_duration,
+            'preset': preset,
+            'duplicates': len(duplicates.get(sequence.name, [])),
+            'status': 'render',
+            'complexity': 1.0,
+            'seconds': 0.0,
+            'bytes': 0.0}
+        jobs.append(job)
+        if quick_batch.batch_passthrough and passthrough_files(sequence, scene, preset, curve_index):
+            job['status'] = 'linked'
+            continue
+        if cache:
+            key = render_key(sequence, scene, preset, transparent, curve_index)
+            entry = cache.entries.get(key)
+            if entry and os.path.isfile(os.path.join(cache.directory, key, entry['file'])):
+                job['status'] = 'cached'
+                continue
+        job['complexity'] = sequence_complexity(sequence, scene, quick_batch.batch_effects, curve_index)
+        job['seconds'], job['bytes'] = estimator.estimate(sequence, scene, preset, job['complexity'])
+
+    #effects and metas in a tree wait for the strips they use, chunks of long strips render at the same time when rendering in background
+    rendered = dict((job['name'], job) for job in jobs if job['status'] == 'render')
+    video_jobs = []
+    audio_jobs = []
+    audio_lane = quick_batch.batch_audio_lane
+    for sequence in renders:
+        job = rendered.get(sequence.name)
+        if job is None:
+            continue
+        after = [input_sequence.name for input_sequence in all_inputs(sequence) + meta_sequences(sequence) if input_sequence.name in rendered]
+        chunks = 1
+        if quick_batch.batch_parallel and quick_batch.batch_chunk and sequence.type != 'SOUND':
+            chunks = len(split_frames(1, job['frames'], quick_batch.batch_chunk_size))
+        pieces = [{'name': job['name'], 'seconds': job['seconds'] / chunks, 'after': after} for chunk in range(chunks)]
+        if audio_lane and sequence.type == 'SOUND':
+            audio_jobs.extend(pieces)
+        else:
+            video_jobs.extend(pieces)
+    workers = quick_batch.batch_workers if quick_batch.batch_parallel else 1
+    order, wall_seconds = schedule_jobs(video_jobs, workers)
+    queue_seconds = schedule_jobs(video_jobs, workers, longest_first=False)[1]
+    if audio_jobs:
+        audio_order, audio_seconds = schedule_jobs(audio_jobs, quick_batch.batch_audio_workers)
+        order = order + audio_order
+        wall_seconds = max(wall_seconds, audio_seconds)
+        queue_seconds = max(queue_seconds, schedule_jobs(audio_jobs, quick_batch.batch_audio_workers, longest_first=False)[1])
+
+    total_bytes = sum(job['bytes'] for job in jobs)
+    free_bytes = free_space(render_directory)
+    enough_space = total_bytes < free_bytes
+    scratch_free_bytes = None
+    if quick_batch.batch_scratch:
+        #the scratch folder holds the renders that are not moved out yet, about one per worker
+        if quick_batch.batch_scratch_directory:
+            scratch_directory = bpy.path.abspath(quick_batch.batch_scratch_directory)
+        else:
+            scratch_directory = tempfile.gettempdir()
+        scratch_free_bytes = free_space(scratch_directory)
+        largest = sorted([job['bytes'] for job in jobs], reverse=True)[:workers]
+        enough_space = enough_space and sum(largest) < scratch_free_bytes
+    return {
+        'scene': scene.name,
+        'render_directory': render_directory,
+        'jobs': jobs,
+        'order': order,
+        'workers': workers,
+        'calibration_renders': estimator.renders,
+        'render_seconds': sum(job['seconds'] for job in jobs),
+        'wall_seconds': wall_seconds,
+        'queue_seconds': queue_seconds,
+        'bytes': total_bytes,
+        'free_bytes': free_bytes,
+        'scratch_free_bytes': scratch_free_bytes,
+        'enough_space': enough_space}
+
+
+def plan_summary(plan):
+    """Returns a one line description of a plan returned by plan_batch(), for the panel"""
+
+    to_render = len([job for job in plan['jobs'] if job['status'] == 'render'])
+    return 'Plan: '+str(to_render)+' of '+str(len(plan['jobs']))+' strips to render, about '+format_duration(plan['wall_seconds'])+', '+format_size(plan['bytes'])
+
+
+def plan_report(plan):
+    """Returns a list of lines describing a plan returned by plan_batch(), with a line for each strip in the proposed order"""
+
+    jobs = dict((job['name'], job) for job in plan['jobs'])
+    lines = ['Batch plan for '+plan['scene']+':']
+    for name in plan['order']:
+        job = jobs[name]
+        line = '  {:<24} {:<8} {:>6} frames  {:<8} ~{:<8} {:>10}'.format(
+            job['name'], job['type'], job['frames'], job['preset'], format_duration(job['seconds']), format_size(job['bytes']))
+        if job['duplicates']:
+            line = line+'  (and '+str(job['duplicates'])+' duplicates)'
+        lines.append(line)
+    for status, description in [('cached', 'from the render cache'), ('linked', 'linked without rendering')]:
+        names = [job['name'] for job in plan['jobs'] if job['status'] == status]
+        if names:
+            lines.append('  '+str(len(names))+' strips '+description+': '+', '.join(names))
+    lines.append('Estimated render time '+format_duration(plan['render_seconds'])+', about '+format_duration(plan['wall_seconds'])+' with '+str(plan['workers'])+' workers in this order, '+format_duration(plan['queue_seconds'])+' in queue order')
+    if plan['calibration_renders']:
+        lines.append('Estimates are calibrated from '+str(plan['calibration_renders'])+' earlier renders')
+    else:
+        lines.append('No earlier renders were logged, estimates use default rates')
+    lines.append('Estimated output '+format_size(plan['bytes'])+', '+format_size(plan['free_bytes'])+' free in '+plan['render_directory'])
+    if plan['scratch_free_bytes'] is not None:
+        lines.append(format_size(plan['scratch_free_bytes'])+' free in the scratch folder')
+    if not plan['enough_space']:
+        lines.append('WARNING: there is not enough free space for this batch')
+    return lines
+
+
+def split_frames(frame_start, frame_end, chunk_size):
+    """Returns a list of (start, end) frame ranges covering frame_start to frame_end, each no more than chunk_size frames long
+    Arguments:
+        frame_start: Integer, first frame
+        frame_end: Integer, last frame, included in the ranges
+        chunk_size: Integer, maximum number of frames in each range"""
+
+    ranges = []
+    chunk_size = max(1, chunk_size)
+    for start in range(frame_start, frame_end + 1, chunk_size):
+        ranges.append((start, min(start + chunk_size - 1, frame_end)))
+    return ranges
+
+
+def movie_path(scene, frame_start, frame_end):
+    """Returns the file a scene renders a movie to when rendering the given frames, Blender adds the frame range to movie file names
+    Arguments:
+        scene: Scene object set to a movie file format
+        frame_start: Integer, first frame rendered
+        frame_end: Integer, last frame rendered"""
+
+    old_start = scene.frame_start
+    old_end = scene.frame_end
+    scene.frame_start = frame_start
+    scene.frame_end = frame_end
+    path = scene.render.frame_path(frame=frame_start)
+    scene.frame_start = old_start
+    scene.frame_end = old_end
+    return path
+
+
+def join_movie_chunks(files, output):
+    """Joins movie files end to end without re-encoding them, using ffmpeg
+    Arguments:
+        files: List of movie file paths, in order
+        output: String, path of the joined movie file
+    Returns: True if the files were joined"""
+
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        return False
+    list_file = output+'.chunks.txt'
+    with open(list_file, 'w') as chunk_list:
+        for file in files:
+            chunk_list.write("file '"+file.replace("'", "'\\''")+"'\n")
+    returncode = subprocess.call([ffmpeg, '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0', '-i', list_file, '-c', 'copy', output])
+    os.remove(list_file)
+    if returncode != 0:
+        return False
+    for file in files:
+        os.remove(file)
+    return True
+
+
+def peak_memory():
+    """Returns the most memory this process has used so far in megabytes, or None where this can't be measured"""
+
+    if os.name != 'posix':
+        return None
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        #reported in bytes on macOS and kilobytes elsewhere
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+#Scene types of the scene.new operator used to create the batch scene for each batch_scene_copy setting
+SCENE_COPY_TYPES = {'FULL_COPY': 'FULL_COPY', 'SEQUENCER': 'LINK_OBJECTS'}
+
+
+def limit_memory(megabytes):
+    """Caps the address space of this process, called by a worker process itself before it renders.
+    Setting the limit in the worker rather than between fork and exec keeps starting workers safe while output threads are running.
+    Arguments:
+        megabytes: Integer, maximum memory the process may use, 0 for no limit"""
+
+    if megabytes <= 0 or os.name != 'posix':
+        return
+    import resource
+    limit_bytes = megabytes * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+
+
+#Return code given to a job whose worker process could not be started, the same a shell uses for a command it can't run
+WORKER_START_FAILED = 127
+
+
+class WorkerPool(object):
+    """Runs RenderJob objects in background Blender processes, no more than a set number at a time.
+    Any executable accepting the same command line can stand in for Blender, see WorkerPool.command()"""
+
+    def __init__(self, executable, blend_file, workers=1, memory_limit=0, retries=0):
+        self.executable = executable
+        self.blend_file = blend_file
+        self.workers = max(1, workers)
+        self.memory_limit = memory_limit
+        self.retries = retries
+        self.pending = []
+        self.running = []
+        self.failed_starts = []
+
+    def command(self, job):
+        """Returns the command line used to run a job.  The worker loads the saved batch file, or the one saved for the job, switches to the job's scene,
+        and runs this script with the job file."""
+
+        return [self.executable, '-b', job.blend_file or self.blend_file, '-S', job.scene_name, '-P', os.path.abspath(__file__), '--',
+                '--qbr-job', job.job_file, '--qbr-memory', str(self.memory_limit)]
+
+    def submit(self, job):
+        self.pending.append(job)
+        self.start_jobs()
+
+    def start_jobs(self):
+        while self.pending and len(self.running) < self.workers:
+            job = self.pending.pop(0)
+            log = open(job.log_file, 'w') if job.log_file else subprocess.DEVNULL
+            job.render_start = time.perf_counter()
+            try:
+                #a new session keeps a Ctrl+C in the terminal Blender was started from from reaching the workers, they are stopped by cancel()
+                process = subprocess.Popen(self.command(job), stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+            except OSError as error:
+                #a missing or unusable worker executable fails the job the same as a worker exiting with an error, poll() reports it
+                if job.log_file:
+                    log.write('Quick Batch Render: could not start the worker '+self.executable+': '+str(error)+'\n')
+                    log.close()
+                self.failed_starts.append(job)
+                continue
+            if job.log_file:
+                log.close()
+            self.running.append((job, process))
+
+    def poll(self):
+        """Checks on running workers, starts pending jobs in any free slots, and returns a list of jobs that have finished since the last poll.
+        Failed jobs are run again until they have been retried as many times as allowed."""
+
+        finished = []
+        still_running = []
+        checked = [(job, process, process.poll()) for job, process in self.running]
+        checked.extend((job, None, WORKER_START_FAILED) for job in self.failed_starts)
+        self.failed_starts = []
+        for job, process, returncode in checked:
+            if returncode is not None:
+                job.render_end = time.perf_counter()
+            if returncode is None:
+                still_running.append((job, process))
+            elif returncode != 0 and job.attempts < self.retries:
+                job.attempts = job.attempts + 1
+                print('retrying '+job.name()+', attempt '+str(job.attempts))
+                self.pending.append(job)
+            else:
+                job.returncode = returncode
+                finished.append(job)
+        self.running = still_running
+        self.start_jobs()
+        return finished
 
+    def busy(self):
+        return len(self.pending) > 0 or len(self.running) > 0 or len(self.failed_starts) > 0
 
-bl_info = {
-    "name": "Quick Batch Render",
-    "description": "Render sequences in the timeline to individual files and automatically create a new copy of the current scene with these strips replaced with the rendered versions.",
-    "author": "Hudson Barkley (Snu/snuq/Aritodo)",
-    "version": (1, 0, 0),
-    "blender": (2, 79, 0),
-    "location": "Sequencer Panel",
-    "wiki_url": "https://github.com/snuq/QuickBatchRender",
-    "tracker_url": "https://github.com/snuq/QuickBatchRender/issues",
-    "category": "Sequencer"
-}
+    def cancel(self):
+        """Stops all running workers and drops any pending jobs"""
 
+        self.pending.clear()
+        self.failed_starts = []
+        for job, process in self.running:
+            process.terminate()
+        for job, process in self.running:
+            process.wait()
+        self.running = []
 
-def copy_curves(copy_from, copy_to, scene_from, scene_to):
-    """Copies animation curves from one sequence to another, this is needed since the copy operator doesn't do this...
+
+def worker_executable(quick_batch):
+    """Returns the program background workers are run with
     Arguments:
-        copy_from: VSE Sequence object to copy from
-        copy_to: VSE Sequence object to copy to
-        scene_from: scene that copy_from is in
-        scene_to: scene that copy_to is in"""
-    if hasattr(scene_from.animation_data, 'action'):
-        scene_to.animation_data_create()
-        scene_to.animation_data.action = bpy.data.actions.new(name=scene_to.name+'Action')
-        for fcurve in scene_from.animation_data.action.fcurves:
-            path = fcurve.data_path
-            path_start = path.split('[', 1)[0]
-            path_end = path.split(']')[-1]
-            test_path = path_start+'["'+copy_from.name+'"]'+path_end
-            if path == test_path:
-                new_path = path_start+'["'+copy_to.name+'"]'+path_end
-                new_curve = scene_to.animation_data.action.fcurves.new(data_path=new_path)
-                new_curve.extrapolation = fcurve.extrapolation
-                new_curve.mute = fcurve.mute
-                #copy keyframe points to new_curve
-                for keyframe in fcurve.keyframe_points:
-                    new_curve.keyframe_points.add()
-                    new_keyframe = new_curve.keyframe_points[-1]
-                    new_keyframe.type = keyframe.type
-                    new_keyframe.amplitude = keyframe.amplitude
-                    new_keyframe.back = keyframe.back
-                    new_keyframe.co = keyframe.co
-                    new_keyframe.easing = keyframe.easing
-                    new_keyframe.handle_left = keyframe.handle_left
-                    new_keyframe.handle_left_type = keyframe.handle_left_type
-                    new_keyframe.handle_right = keyframe.handle_right
-                    new_keyframe.handle_right_type = keyframe.handle_right_type
-                    new_keyframe.interpolation = keyframe.interpolation
-                    new_keyframe.period = keyframe.period
-                new_curve.update()
+        quick_batch: QuickBatchRenderSetting of the batch scene"""
+
+    if quick_batch.batch_worker_executable:
+        return bpy.path.abspath(quick_batch.batch_worker_executable)
+    return bpy.app.binary_path
+
+
+def write_job_scenes(blend_file, jobs):
+    """Writes the temporary scenes of jobs, and the data they use, to a .blend file for background workers to load.
+    Only those scenes are written, instead of a copy of the whole file each time more jobs are ready.
+    Arguments:
+        blend_file: String, path of the file to write
+        jobs: List of RenderJob objects set up by setup_render()"""
+
+    scenes = set(bpy.data.scenes[job.scene_name] for job in jobs)
+    bpy.data.libraries.write(blend_file, scenes, relative_remap=True, fake_user=True)
+
+
+def run_job_file(job_file):
+    """Renders a job description written by RenderJob.write(), this is run inside a background worker process
+    Arguments:
+        job_file: String, path to the json job file
+    Returns: Integer exit code for the worker process, 0 on success"""
+
+    with open(job_file) as file:
+        job = json.load(file)
+    scene = bpy.data.scenes.get(job['scene'])
+    if scene is None:
+        print('Quick Batch Render: scene '+job['scene']+' not found')
+        return 1
+    override = scene_context(scene)
+    try:
+        if job['audio']:
+            bpy.ops.sound.mixdown(override, filepath=job['file'], format='S16', bitrate=192, container=job['container'], codec=job['codec'])
+        else:
+            scene.frame_start = job['frame_start']
+            scene.frame_end = job['frame_end']
+            bpy.ops.render.render(override, animation=True, scene=scene.name)
+    except Exception as error:
+        print('Quick Batch Render: rendering '+job['sequence']+' failed: '+str(error))
+        return 1
+    return 0
+
+
+#Blender 2.79 has no way for the render thread to schedule work on the main thread, so the modal operator is woken up by a short timer,
+#and the completion handler records when the render really finished so the gap between renders can be measured.
+WAKEUP_INTERVAL = 0.05
+render_completion = {}
+
+#Outcome of the last batch render, read by the command line entry point to set its exit code
+batch_results = {}
+
+
+def add_handler(handlers, handler):
+    """Adds a function to a bpy.app.handlers list if it isn't in it already"""
+
+    if handler not in handlers:
+        handlers.append(handler)
+
+
+def remove_handler(handlers, handler):
+    """Removes every instance of a function from a bpy.app.handlers list"""
+
+    while handler in handlers:
+        handlers.remove(handler)
 
 
 def batch_render_complete_handler(scene):
-    """Handler called when each element of a batch render is completed"""
+    """Handler called when each element of a batch render is completed, this may not be called from the main thread, so it only records the completion"""
 
+    render_completion['time'] = time.perf_counter()
     scene.quick_batch.batch_rendering = False
-    handlers = bpy.app.handlers.render_complete
-    for handler in handlers:
-        if "batch_render_complete_handler" in str(handler):
-            handlers.remove(handler)
+    remove_handler(bpy.app.handlers.render_complete, batch_render_complete_handler)
+    remove_handler(bpy.app.handlers.render_cancel, batch_render_cancel_handler)
 
 
 def batch_render_cancel_handler(scene):
     """Handler called when the user cancels a render that is part of a batch render"""
 
     scene.quick_batch.batch_rendering_cancel = True
-    handlers = bpy.app.handlers.render_cancel
-    for handler in handlers:
-        if "batch_render_cancel_handler" in str(handler):
-            handlers.remove(handler)
+    remove_handler(bpy.app.handlers.render_complete, batch_render_complete_handler)
+    remove_handler(bpy.app.handlers.render_cancel, batch_render_cancel_handler)
 
 
 class QuickBatchRenderPanel(bpy.types.Panel):
@@ -123,6 +2277,11 @@ class QuickBatchRenderPanel(bpy.types.Panel):
         layout = self.layout
         row = layout.row()
         row.operator('qbr.quickbatchrender', text='Batch Render')
+        row.operator('qbr.resumebatch', text='Resume Batch')
+        row.operator('qbr.planbatch', text='Plan Batch')
+        if quick_batch.batch_status:
+            row = layout.row()
+            row.label(quick_batch.batch_status)
         row = layout.row()
         row.prop(quick_batch, 'batch_render_directory')
         row = layout.row()
@@ -130,8 +2289,50 @@ class QuickBatchRenderPanel(bpy.types.Panel):
         row = layout.row()
         row.prop(quick_batch, 'batch_effects', toggle=True)
         row.prop(quick_batch, 'batch_audio', toggle=True)
+        if quick_batch.batch_audio:
+            row = layout.row()
+            row.prop(quick_batch, 'batch_audio_lane', toggle=True)
+            if quick_batch.batch_audio_lane:
+                row.prop(quick_batch, 'batch_audio_workers')
+        row = layout.row()
+        row.prop(quick_batch, 'batch_effect_strips', toggle=True)
         row = layout.row()
         row.prop(quick_batch, 'batch_meta')
+        if quick_batch.batch_meta == 'TREE':
+            row.prop(quick_batch, 'batch_meta_composite', toggle=True)
+        row = layout.row()
+        row.prop(quick_batch, 'batch_scene_copy')
+        row = layout.row()
+        row.prop(quick_batch, 'batch_passthrough', toggle=True)
+        row.prop(quick_batch, 'batch_deduplicate', toggle=True)
+        row = layout.row()
+        row.prop(quick_batch, 'batch_reuse_frames', toggle=True)
+        row = layout.row()
+        row.prop(quick_batch, 'batch_scratch', toggle=True)
+        if quick_batch.batch_scratch:
+            row.prop(quick_batch, 'batch_transfer_threads')
+            row = layout.row()
+            row.prop(quick_batch, 'batch_scratch_directory')
+        row = layout.row()
+        row.prop(quick_batch, 'batch_parallel', toggle=True)
+        if quick_batch.batch_parallel:
+            row = layout.row()
+            row.prop(quick_batch, 'batch_workers')
+            row.prop(quick_batch, 'batch_worker_memory')
+            row = layout.row()
+            row.prop(quick_batch, 'batch_worker_executable')
+            row = layout.row()
+            row.prop(quick_batch, 'batch_retries')
+            row = layout.row()
+            row.prop(quick_batch, 'batch_chunk', toggle=True)
+            if quick_batch.batch_chunk:
+                row.prop(quick_batch, 'batch_chunk_size')
+        row = layout.row()
+        row.prop(quick_batch, 'batch_cache', toggle=True)
+        if quick_batch.batch_cache:
+            row.prop(quick_batch, 'batch_cache_verify', toggle=True)
+            row = layout.row()
+            row.prop(quick_batch, 'batch_cache_size')
         box = layout.box()
         row = box.row()
         row.label("Render Presets:")
@@ -153,10 +2354,37 @@ class QuickBatchRender(bpy.types.Operator):
     _timer = None
 
     rendering = bpy.props.BoolProperty(default=False)
+    resume = bpy.props.BoolProperty(default=False, options={'SKIP_SAVE'})
     renders = []
     rendering_sequence = None
     rendering_scene = None
+    rendering_job = None
     original_scene = None
+    pool = None
+    audio_pool = None
+    audio_jobs = []
+    output_pool = None
+    output_checks = []
+    requeued = {}
+    failed_logs = set()
+    frame_manifest = None
+    unfinished = set()
+    source_keys = {}
+    job_blends = 0
+    cache = None
+    journal = None
+    completed = {}
+    curve_index = None
+    meta_parents = None
+    dependents = None
+    duplicates = {}
+    job_gaps = []
+    completed_time = None
+    metrics_file = ''
+    progress = None
+    scene_copy_time = 0.0
+    finished_renders = 0
+    failed_renders = 0
     file = bpy.props.StringProperty('')
     total_renders = bpy.props.IntProperty(0)
     total_frames = bpy.props.IntProperty(0)
@@ -223,90 +2451,440 @@ class QuickBatchRender(bpy.types.Operator):
             scene.render.image_settings.color_depth = '32'
             scene.render.image_settings.exr_codec = 'ZIP'
 
-    def render_sequence(self, sequence):
-        """Begins rendering process: creates a temporary scene, sets it up, copies the sequence to the temporary scene, and begins rendering
+    def setup_render(self, sequence, key=''):
+        """Creates a temporary scene, sets it up, and copies the sequence to the temporary scene, ready to be rendered
         Arguments:
-            sequence: VSE Sequence object to begin rendering"""
+            sequence: VSE Sequence object to set up a render for
+            key: String, render key of the sequence, if given the sequence is rendered into the render cache
+        Returns: RenderJob object"""
 
-        self.rendering = True
-        self.rendering_sequence = sequence
-        self.original_scene = bpy.context.scene
-        original_start = sequence.frame_final_start
-        original_end = sequence.frame_final_end
-        original_channel = sequence.channel
-        bpy.ops.sequencer.select_all(action='SELECT')
-        bpy.ops.sequencer.copy()
+        setup_start = time.perf_counter()
+        original_scene = self.original_scene
+        metas = meta_path(sequence, self.meta_parents)
+        enter_metas(original_scene, metas)
+        override = scene_context(original_scene)
+        selection, changed = select_for_copy(sequence, self.dependents)
+        try:
+            bpy.ops.sequencer.copy(override)
+        finally:
+            restore_inputs(changed)
+            for selected in selection:
+                selected.select = False
+        exit_metas(original_scene, metas)
 
         #create a temporary scene
-        bpy.ops.scene.new(type='EMPTY')
-        self.rendering_scene = bpy.context.scene
-        self.rendering_scene_name = self.rendering_scene.name
-
-        #copy sequence to new scene and set up scene
-        bpy.ops.sequencer.paste()
-        bpy.ops.sequencer.select_all(action='SELECT')
-        for seq in self.rendering_scene.sequence_editor.sequences:
-            if seq.frame_final_start == original_start and seq.frame_final_end == original_end and seq.channel == original_channel:
-                seq.select = False
-        bpy.ops.sequencer.delete()
-
-        temp_sequence = self.rendering_scene.sequence_editor.sequences[0]
-        copy_curves(sequence, temp_sequence, self.original_scene, self.rendering_scene)
-        self.rendering_scene.frame_start = temp_sequence.frame_final_start
-        self.rendering_scene.frame_end = temp_sequence.frame_final_end - 1
+        rendering_scene = new_scene(original_scene, 'EMPTY')
+        job = RenderJob(sequence, rendering_scene, key=key)
+        job.complexity = sequence_complexity(sequence, original_scene, original_scene.quick_batch.batch_effects, self.curve_index)
+
+        #copy sequence to new scene, keeping only it and its inputs.  The new scene is empty, so pasted sequences keep their names
+        override = scene_context(rendering_scene)
+        bpy.ops.sequencer.paste(override)
+        keep = [sequence.name] + [input_sequence.name for input_sequence in all_inputs(sequence)]
+        delete = False
+        for seq in rendering_scene.sequence_editor.sequences:
+            seq.select = seq.name not in keep
+            delete = delete or seq.select
+        if delete:
+            bpy.ops.sequencer.delete(override)
+
+        temp_sequence = rendering_scene.sequence_editor.sequences_all[sequence.name]
+        for input_sequence in all_inputs(temp_sequence):
+            #inputs still feed an effect when muted, this keeps them from showing behind a transparent effect
+            input_sequence.mute = True
+        curves_start = time.perf_counter()
+        copy_curves(sequence, temp_sequence, original_scene, rendering_scene, self.curve_index)
+        job.timings['copy_curves'] = time.perf_counter() - curves_start
+        rendering_scene.frame_start = temp_sequence.frame_final_start
+        rendering_scene.frame_end = temp_sequence.frame_final_end - 1
+        job.frame_start = rendering_scene.frame_start
+        job.frame_end = rendering_scene.frame_end
+        job.ranges = [(job.frame_start, job.frame_end)]
+        job.frame_origin = sequence.frame_start
         filename = sequence.name
-        if self.original_scene.quick_batch.batch_render_directory:
-            path = self.original_scene.quick_batch.batch_render_directory
+        if key and self.cache:
+            path = self.cache.entry_directory(key)
         else:
-            path = self.rendering_scene.render.filepath
-        self.rendering_scene.render.filepath = os.path.join(path, filename)
+            path = get_render_directory(original_scene)
+        if original_scene.quick_batch.batch_scratch:
+            job.final_directory = path
+            path = get_scratch_directory(original_scene, path)
+        rendering_scene.render.filepath = os.path.join(path, filename)
 
-        #render
+        setting, transparent = render_preset(sequence, original_scene.quick_batch)
+        job.preset = setting
         if sequence.type != 'SOUND':
-            if sequence.blend_type in ['OVER_DROP', 'ALPHA_OVER']:
-                transparent = True
-                setting = self.original_scene.quick_batch.transparent_settings_menu
-            else:
-                transparent = False
-                setting = self.original_scene.quick_batch.video_settings_menu
-            self.set_render_settings(self.rendering_scene, setting, transparent)
+            self.set_render_settings(rendering_scene, setting, transparent)
 
-            if not self.original_scene.quick_batch.batch_effects:
+            if not original_scene.quick_batch.batch_effects:
                 temp_sequence.modifiers.clear()
-            self.file = self.rendering_scene.render.frame_path(frame=1)
-            bpy.ops.render.render('INVOKE_DEFAULT', animation=True)
-            self.rendering_scene.quick_batch.batch_rendering = True
-            if 'batch_render_complete_handler' not in str(bpy.app.handlers.render_complete):
-                bpy.app.handlers.render_complete.append(batch_render_complete_handler)
-            if 'batch_render_cancel_handler' not in str(bpy.app.handlers.render_cancel):
-                bpy.app.handlers.render_cancel.append(batch_render_cancel_handler)
-            if self._timer:
-                bpy.context.window_manager.event_timer_remove(self._timer)
-            self._timer = bpy.context.window_manager.event_timer_add(1, bpy.context.window)
+            job.file = rendering_scene.render.frame_path(frame=rendering_scene.frame_start)
+            if self.frame_manifest and not job.is_movie():
+                self.reuse_frames(job, sequence, setting, transparent)
+        else:
+            extension, job.container, job.codec = audio_render_settings(original_scene.quick_batch.audio_settings_menu)
+            job.file = rendering_scene.render.filepath+extension
+        #renders into the cache or a scratch folder end up in the render directory, either moved there or linked
+        output = os.path.join(get_render_directory(original_scene), os.path.basename(job.file))
+        self.journal.write('rendering', sequence=sequence.name, file=output)
+        self.show_scene(original_scene)
+        job.timings['setup'] = time.perf_counter() - setup_start
+        return job
+
+    def reuse_frames(self, job, sequence, setting, transparent):
+        """Places the frames an image sequence job needs from an earlier render of the same sequence at their output paths,
+        and sets the job to only render the frames that are left.  When rendering to a scratch folder the frames are placed straight
+        in the final folder, so only the rendered frames are moved there.
+        Arguments:
+            job: RenderJob object set up to render an image sequence
+            sequence: VSE Sequence object the job renders
+            setting: String, render preset of the sequence
+            transparent: Boolean, whether the sequence is rendered with transparency"""
+
+        job.frame_key = render_key(sequence, self.original_scene, setting, transparent, self.curve_index, relative=True, trim=False)
+        if not job.frame_key:
+            return
+        frames, origin, directory = self.frame_manifest.lookup(job.frame_key)
+        if not frames:
+            return
+        render = job.scene.render
+        output_directory = job.final_directory or os.path.dirname(render.frame_path(frame=job.frame_start))
+        if directory == output_directory and origin != job.frame_origin:
+            #the sequence moved, so its frames are placed over files the entry lists as other frames, the entry is only valid again once
+            #this render is finished and stored
+            self.frame_manifest.remove(job.frame_key)
+        outputs = list(range(job.frame_start, job.frame_end + 1))
+        if origin < job.frame_origin:
+            #the sequence moved later in the timeline, work backwards so a frame that is still needed is not replaced before it is used
+            outputs.reverse()
+        missing = []
+        for frame in outputs:
+            source = frames.get(frame - job.frame_origin)
+            if source is None:
+                missing.append(frame)
+                continue
+            filename = os.path.basename(render.frame_path(frame=frame))
+            try:
+                link_file(source, os.path.join(output_directory, filename))
+                job.reused_frames = job.reused_frames + 1
+                job.placed_files.append(filename)
+            except OSError:
+                missing.append(frame)
+        job.ranges = contiguous_ranges(sorted(missing))
+        print('reusing '+str(job.reused_frames)+' rendered frames of '+sequence.name+', rendering '+str(len(missing)))
+
+    def show_scene(self, scene):
+        """Switches the screen to a scene, when there is one.  Nothing in a batch depends on which scene is shown, so this works in background mode too"""
+
+        if bpy.context.screen:
+            bpy.context.screen.scene = scene
+
+    def render_key(self, sequence):
+        """Returns the render key of a sequence in the batch scene, see render_key().  It finds the sequence in the render cache,
+        and is recorded in the journal so a resumed batch only reuses a finished render if the sequence has not changed since."""
+
+        if sequence.name in self.source_keys:
+            return self.source_keys[sequence.name]
+        setting, transparent = render_preset(sequence, self.original_scene.quick_batch)
+        return render_key(sequence, self.original_scene, setting, transparent, self.curve_index)
+
+    def cached_job(self, sequence, key):
+        """Returns a finished RenderJob for a sequence if it was completed unchanged by the interrupted batch being resumed, or is found in the render cache,
+        or None if it needs to be rendered
+        Arguments:
+            sequence: VSE Sequence object
+            key: String, render key of the sequence"""
+
+        record = self.completed.get(sequence.name)
+        if record and record['key'] and record['key'] == key:
+            job = RenderJob(sequence, None, key=record['key'])
+            job.kind = record['kind']
+            job.file = record['file']
+            job.files = record['files']
+            job.cached = True
+            job.preset = render_preset(sequence, self.original_scene.quick_batch)[0]
+            if output_exists(job):
+                return job
+        if not key or not self.cache:
+            return None
+        entry = self.cache.lookup(key)
+        if entry is None:
+            return None
+        job = RenderJob(sequence, None, key=key)
+        job.kind = entry['kind']
+        job.file = os.path.join(self.cache.directory, key, entry['file'])
+        job.files = entry['files']
+        job.cached = True
+        job.preset = render_preset(sequence, self.original_scene.quick_batch)[0]
+        return job
+
+    def passthrough_job(self, sequence):
+        """Returns a finished RenderJob for a sequence that doesn't need rendering, with its source files linked into the render directory,
+        or None if it needs to be rendered
+        Arguments:
+            sequence: VSE Sequence object"""
+
+        quick_batch = self.original_scene.quick_batch
+        if not quick_batch.batch_passthrough:
+            return None
+        setting = render_preset(sequence, quick_batch)[0]
+        sources = passthrough_files(sequence, self.original_scene, setting, self.curve_index)
+        if not sources:
+            return None
+        directory = get_render_directory(self.original_scene)
+        job = RenderJob(sequence, None)
+        job.kind = sequence.type
+        job.preset = setting
+        destinations = []
+        try:
+            for source in sources:
+                if sequence.type == 'IMAGE':
+                    destination = os.path.join(directory, sequence.name+'_'+os.path.basename(source))
+                else:
+                    destination = os.path.join(directory, sequence.name+os.path.splitext(source)[1])
+                job.passthrough = link_file(source, destination)
+                destinations.append(destination)
+        except OSError as error:
+            print('could not link '+sequence.name+', it will be rendered: '+str(error))
+            return None
+        job.file = destinations[0]
+        job.files = [os.path.basename(destination) for destination in destinations[1:]]
+        return job
+
+    def ready_job(self, sequence):
+        """Returns a finished RenderJob for a sequence that doesn't need rendering, because it can be linked or is already rendered
+        Arguments:
+            sequence: VSE Sequence object
+        Returns: Tuple of the RenderJob, or None if the sequence needs rendering, and the render key of the sequence"""
+
+        job = self.passthrough_job(sequence)
+        if job:
+            print('linking '+sequence.name+' without rendering')
+            return job, ''
+        key = self.render_key(sequence)
+        job = self.cached_job(sequence, key)
+        if job:
+            print('using cached render of '+sequence.name)
+        return job, key
+
+    def render_sequence(self, sequence, key='', wait=False):
+        """Begins rendering process: sets up a temporary scene for the sequence, and begins rendering it in this Blender session
+        Arguments:
+            sequence: VSE Sequence object to begin rendering
+            key: String, render key of the sequence
+            wait: Boolean, render before returning instead of in the background of the interface.  The job returncode is set if the render fails."""
+
+        self.rendering = True
+        self.rendering_sequence = sequence
+        job = self.setup_render(sequence, key)
+        if self.completed_time is not None:
+            self.job_gaps.append(time.perf_counter() - self.completed_time)
+            self.completed_time = None
+        self.rendering_job = job
+        self.rendering_scene = job.scene
+        self.rendering_scene_name = job.scene_name
+        self.file = job.file
+
+        #render
+        render_completion.clear()
+        job.render_start = time.perf_counter()
+        self.render_frames(job, wait=wait)
+        if not wait and not self._timer:
+            self._timer = bpy.context.window_manager.event_timer_add(WAKEUP_INTERVAL, bpy.context.window)
+
+    def render_frames(self, job, wait=False):
+        """Renders the next frame range of a job in this Blender session, or every range that is left when waiting.
+        Jobs only have more than one range when frames are reused from an earlier render, see reuse_frames().
+        Arguments:
+            job: RenderJob object, the job being rendered
+            wait: Boolean, render before returning instead of in the background of the interface.  The job returncode is set if the render fails."""
+
+        scene = job.scene
+        while job.ranges:
+            scene.frame_start, scene.frame_end = job.ranges.pop(0)
+            if not job.audio and not wait:
+                scene.quick_batch.batch_rendering = True
+                add_handler(bpy.app.handlers.render_complete, batch_render_complete_handler)
+                add_handler(bpy.app.handlers.render_cancel, batch_render_cancel_handler)
+                bpy.ops.render.render('INVOKE_DEFAULT', animation=True, scene=job.scene_name)
+                return
+            try:
+                if job.audio:
+                    bpy.ops.sound.mixdown(scene_context(scene), filepath=job.file, format='S16', bitrate=192, container=job.container, codec=job.codec)
+                else:
+                    bpy.ops.render.render(animation=True, scene=job.scene_name)
+            except RuntimeError as error:
+                print('rendering '+job.sequence_name+' failed: '+str(error))
+                job.returncode = 1
+                break
+        #finished, or every frame was reused
+        render_completion['time'] = time.perf_counter()
+        scene.quick_batch.batch_rendering = False
+
+    def start_parallel(self):
+        """Starts a WorkerPool of background processes and hands it every queued sequence that is ready to render, see submit_ready()"""
+
+        quick_batch = self.original_scene.quick_batch
+        self.pool = WorkerPool(worker_executable(quick_batch), '', workers=quick_batch.batch_workers, memory_limit=quick_batch.batch_worker_memory, retries=quick_batch.batch_retries)
+        self.job_blends = 0
+        self.submit_ready()
+
+    def submit_ready(self):
+        """Sets up every queued sequence whose inputs are finished, writes their temporary scenes to a file for the workers to load,
+        and submits the jobs to the WorkerPool.  Called again as jobs are imported, so effects start as soon as the strips they use are done,
+        while effects that don't depend on each other render at the same time."""
+
+        quick_batch = self.original_scene.quick_batch
+        work_directory = get_work_directory(self.original_scene)
+        jobs = []
+        stalled = not self.busy()
+        ready = self.take_ready(stalled)
+        while ready:
+            for sequence in ready:
+                job, key = self.ready_job(sequence)
+                if job:
+                    self.finish_render(job)
+                    continue
+                jobs.append(self.setup_render(sequence, key))
+            #sequences imported without rendering may be the last input another sequence was waiting for
+            ready = self.take_ready(stalled and not jobs)
+        worker_jobs = []
+        for job in jobs:
+            if not job.ranges:
+                #every frame was reused from an earlier render
+                job.write(work_directory)
+                job.timings['render'] = 0.0
+                self.check_render(job)
+                continue
+            if quick_batch.batch_chunk and not job.audio and job.frame_end - job.frame_start + 1 > quick_batch.batch_chunk_size:
+                if job.is_movie() and not shutil.which('ffmpeg'):
+                    print('ffmpeg not found, rendering '+job.sequence_name+' as a single job')
+                else:
+                    worker_jobs.extend(job.split(quick_batch.batch_chunk_size))
+                    continue
+            if job.ranges != [(job.frame_start, job.frame_end)]:
+                #only the frames missing from an earlier render are rendered
+                worker_jobs.extend(job.split(job.frames))
+                continue
+            worker_jobs.append(job)
+        if not worker_jobs:
+            return
+
+        self.job_blends = self.job_blends + 1
+        if self.job_blends == 1:
+            blend_file = os.path.join(work_directory, 'batch_render_jobs.blend')
         else:
-            audio_format = self.original_scene.quick_batch.audio_settings_menu
-            if audio_format == 'FLAC':
-                extension = '.flac'
-                container = 'FLAC'
-                codec = 'FLAC'
-            elif audio_format == 'MP3':
-                extension = '.mp3'
-                container = 'MP3'
-                codec = 'MP3'
-            elif audio_format == 'OGG':
-                extension = '.ogg'
-                container = 'OGG'
-                codec = 'VORBIS'
-            else:  #audio_format == 'WAV'
-                extension = '.wav'
-                container = 'WAV'
-                codec = 'PCM'
-            bpy.ops.sound.mixdown(filepath=self.rendering_scene.render.filepath+extension, format='S16', bitrate=192, container=container, codec=codec)
-            self.file = self.rendering_scene.render.filepath+extension
-            self.rendering_scene.quick_batch.batch_rendering = False
-            if self._timer:
-                bpy.context.window_manager.event_timer_remove(self._timer)
-            self._timer = bpy.context.window_manager.event_timer_add(1, bpy.context.window)
+            blend_file = os.path.join(work_directory, 'batch_render_jobs_'+str(self.job_blends)+'.blend')
+        write_job_scenes(blend_file, worker_jobs)
+        for job in worker_jobs:
+            job.blend_file = blend_file
+            job.write(work_directory)
+            self.pool.submit(job)
+
+    def take_ready(self, stalled=False):
+        """Takes the sequences off the render list whose inputs are all finished, see waiting_on()
+        Arguments:
+            stalled: Boolean, nothing is being rendered or checked, so if no sequence is ready, the inputs they wait for will never finish
+        Returns: List of VSE Sequence objects"""
+
+        ready = [sequence for sequence in self.renders if not self.waiting_on(sequence)]
+        if not ready and stalled:
+            #render the rest from their inputs as they are
+            ready = self.unblocked_renders()
+        self.renders = [sequence for sequence in self.renders if sequence not in ready]
+        return ready
+
+    def busy(self):
+        """Checks if anything is still rendering or being checked: in this window, on the worker pool, on the audio lane or on the output threads.
+        Sequences waiting for their inputs are only rendered from the inputs as they are once nothing is."""
+
+        return bool(self.rendering_job or self.output_checks or self.audio_jobs or (self.pool and self.pool.busy()))
+
+    def unblocked_renders(self):
+        """Returns the queued sequences that don't use or contain any other queued sequence, these are rendered from their inputs as they are
+        when nothing else can finish.  A meta is never taken before the sequences inside it, since replacing it removes them."""
+
+        queued = set(sequence.name for sequence in self.renders)
+        unblocked = [sequence for sequence in self.renders if not any(used.name in queued for used in all_inputs(sequence) + meta_sequences(sequence))]
+        return unblocked or self.renders[:1]
+
+    def waiting_on(self, sequence):
+        """Checks if an effect sequence uses, or a meta sequence contains, any sequence that is still to be rendered and imported.
+        It is rendered from the imported sequences once they are.
+        Arguments:
+            sequence: VSE Sequence object"""
+
+        for input_sequence in all_inputs(sequence) + meta_sequences(sequence):
+            if input_sequence.name in self.unfinished:
+                return True
+        return False
+
+    def start_audio_lane(self):
+        """Takes the audio sequences out of the render list and renders them in background processes while the video sequences render.
+        Audio sequences are rendered and imported in timeline order."""
+
+        self.audio_jobs = []
+        self.audio_pool = None
+        quick_batch = self.original_scene.quick_batch
+        if not quick_batch.batch_audio_lane:
+            return
+        audio = [sequence for sequence in self.renders if sequence.type == 'SOUND']
+        if not audio:
+            return
+        self.renders = [sequence for sequence in self.renders if sequence.type != 'SOUND']
+        audio.sort(key=lambda sequence: (sequence.frame_final_start, sequence.channel))
+        for sequence in audio:
+            job, key = self.ready_job(sequence)
+            if job:
+                self.finish_render(job)
+                continue
+            self.audio_jobs.append(self.setup_render(sequence, key))
+        if not self.audio_jobs:
+            return
+        work_directory = get_work_directory(self.original_scene)
+        for job in self.audio_jobs:
+            job.write(work_directory)
+        blend_file = os.path.join(work_directory, 'batch_audio_jobs.blend')
+        write_job_scenes(blend_file, self.audio_jobs)
+        self.audio_pool = WorkerPool(worker_executable(quick_batch), blend_file, workers=quick_batch.batch_audio_workers, memory_limit=quick_batch.batch_worker_memory, retries=quick_batch.batch_retries)
+        for job in self.audio_jobs:
+            self.audio_pool.submit(job)
+
+    def collect_audio(self):
+        """Imports finished audio jobs, only once every audio job before them in the timeline has been imported"""
+
+        if not self.audio_pool:
+            return
+        self.audio_pool.poll()
+        while self.audio_jobs and self.audio_jobs[0].returncode is not None:
+            job = self.audio_jobs.pop(0)
+            if job.returncode == 0:
+                job.timings['render'] = job.render_end - job.render_start
+                self.check_render(job)
+            else:
+                self.render_failed(job)
+
+    def cancel_pool(self, pool):
+        """Stops all worker processes of a WorkerPool and removes the temporary scenes of any unfinished jobs"""
+
+        jobs = [job for job, process in pool.running] + pool.pending + pool.failed_starts
+        pool.cancel()
+        for job in jobs:
+            if job.parent:
+                job = job.parent
+            scene = bpy.data.scenes.get(job.scene_name)
+            if scene:
+                scene.user_clear()
+                bpy.data.scenes.remove(scene)
+        self.show_scene(self.original_scene)
+
+    def cancel_parallel(self, context):
+        """Stops all worker processes and removes the temporary scenes of any unfinished jobs"""
+
+        if self._timer:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+        self.cancel_pool(self.pool)
 
     def copy_settings(self, sequence, new_sequence):
         """Copies the needed settings from the original sequence to the newly imported sequence
@@ -322,94 +2900,390 @@ class QuickBatchRender(bpy.types.Operator):
         if new_sequence.type != 'SOUND':
             new_sequence.alpha_mode = sequence.alpha_mode
 
-    def finish_render(self):
-        """Finishes the process of rendering a sequence by replacing the original sequence, and deleting the temporary scene"""
-        bpy.context.screen.scene = self.rendering_scene
-        try:
-            bpy.ops.render.view_cancel()
-        except:
-            pass
-        if self.rendering_sequence.type != 'SOUND':
-            file_format = self.rendering_scene.render.image_settings.file_format
-            if file_format in ['AVI_JPEG', 'AVI_RAW', 'FRAMESERVER', 'H264', 'FFMPEG', 'THEORA', 'XVID']:
-                #delete temporary scene
-                bpy.ops.scene.delete()
-                bpy.context.screen.scene = self.original_scene
-                new_sequence = self.original_scene.sequence_editor.sequences.new_movie(name=self.rendering_sequence.name+' rendered', filepath=self.file, channel=self.rendering_sequence.channel, frame_start=self.rendering_sequence.frame_final_start)
-            else:
-                files = []
-                for frame in range(2, self.rendering_scene.frame_end):
-                    files.append(os.path.split(self.rendering_scene.render.frame_path(frame=frame))[1])
-                #delete temporary scene
-                bpy.ops.scene.delete()
-                bpy.context.screen.scene = self.original_scene
-                new_sequence = self.original_scene.sequence_editor.sequences.new_image(name=self.rendering_sequence.name+' rendered', filepath=self.file, channel=self.rendering_sequence.channel, frame_start=self.rendering_sequence.frame_final_start)
-                for file in files:
-                    new_sequence.elements.append(file)
-        else:
+    def finish_render(self, job):
+        """Finishes the process of rendering a sequence by replacing the original sequence and any duplicates of it, and deleting the temporary scene
+        Arguments:
+            job: RenderJob object that has finished rendering, or was found in the render cache"""
+
+        finish_start = time.perf_counter()
+        rendering_sequence = job.sequence
+        if job.scene:
+            try:
+                bpy.ops.render.view_cancel()
+            except:
+                pass
+            if not job.kind:
+                job.read_output()
             #delete temporary scene
-            bpy.ops.scene.delete()
-            bpy.context.screen.scene = self.original_scene
+            delete_scene(job.scene)
+            if job.key and self.cache:
+                self.cache.store(job.key, job.kind, job.file, job.files)
+        render_directory = get_render_directory(self.original_scene)
+        if job.key and self.cache and os.path.dirname(job.file) != render_directory:
+            #the batch scene uses links in the render directory, so evicting the cache entry doesn't take the files from under it
+            try:
+                link_outputs(job, render_directory)
+            except OSError as error:
+                print('could not link the render of '+job.sequence_name+' out of the render cache, it is used from the cache: '+str(error))
+        if job.frame_key and self.frame_manifest:
+            frames = {}
+            for frame, file in zip(range(job.frame_start, job.frame_end + 1), [os.path.basename(job.file)] + job.files):
+                frames[frame - job.frame_origin] = file
+            self.frame_manifest.store(job.frame_key, os.path.dirname(job.file), job.frame_origin, frames)
+        verified = job.verified if job.verified is not None else output_exists(job)
+        self.show_scene(self.original_scene)
+        job.duplicates = self.duplicates.pop(rendering_sequence.name, [])
+        for sequence in [rendering_sequence] + job.duplicates:
+            self.unfinished.discard(sequence.name)
+            self.journal.write('completed', sequence=sequence.name, key=job.key, kind=job.kind, file=job.file, files=job.files, verified=verified)
+            self.replace_sequence(sequence, job)
+        job.timings['finish'] = time.perf_counter() - finish_start
+        self.record_metrics(job)
+
+    def check_render(self, job):
+        """Imports a job that finished rendering once its files are verified on an output thread, which also moves them to their
+        final folder when rendering to a scratch folder.  The job is imported later by collect_checks(), between renders when rendering in this window.
+        Arguments:
+            job: RenderJob object that has finished rendering"""
+
+        job.read_output()
+        future = self.output_pool.submit(check_output, job.kind, output_files(job), job.frame_start, job.final_directory, set(job.placed_files))
+        self.output_checks.append((job, future))
 
-            new_sequence = self.original_scene.sequence_editor.sequences.new_sound(name=self.rendering_sequence.name+' rendered', filepath=self.file, channel=self.rendering_sequence.channel, frame_start=self.rendering_sequence.frame_final_start)
+    def collect_checks(self, requeue=True):
+        """Imports every job whose files have been verified, and moved out of the scratch folder, since the last call
+        Arguments:
+            requeue: Boolean, render jobs that failed verification again, otherwise they are reported as failed"""
+
+        for check in [check for check in self.output_checks if check[1].done()]:
+            self.output_checks.remove(check)
+            job, future = check
+            if future.cancelled():
+                delete_scene(job.scene)
+                continue
+            try:
+                problems, timings = future.result()
+            except OSError as error:
+                print('moving the render of '+job.sequence_name+' failed, its files are left in the scratch folder: '+str(error))
+                self.render_failed(job)
+                continue
+            job.timings.update(timings)
+            if problems:
+                print('the render of '+job.sequence_name+' failed verification: '+'; '.join(problems))
+                if requeue:
+                    self.requeue_render(job)
+                else:
+                    self.render_failed(job)
+                continue
+            job.verified = True
+            if job.final_directory:
+                job.file = os.path.join(job.final_directory, os.path.basename(job.file))
+            self.finish_render(job)
+
+    def requeue_render(self, job):
+        """Renders a job again after its files failed verification, the original sequence stays in the batch scene until then.
+        Once the sequence has been rendered again as many times as the Retries setting allows, it is reported as failed instead.
+        Arguments:
+            job: RenderJob object that failed verification"""
+
+        retries = self.requeued.get(job.sequence_name, 0)
+        if retries >= self.original_scene.quick_batch.batch_retries:
+            self.render_failed(job)
+            return
+        self.requeued[job.sequence_name] = retries + 1
+        print('rendering '+job.sequence_name+' again, attempt '+str(retries + 1))
+        for file in output_files(job):
+            if os.path.isfile(file):
+                os.remove(file)
+        job.kind = ''
+        job.files = []
+        job.placed_files = []
+        job.returncode = None
+        pool = self.audio_pool if job.audio and self.audio_pool else self.pool
+        if pool is None:
+            #rendering in this window, the sequence is set up again in a new temporary scene
+            delete_scene(job.scene)
+            self.show_scene(self.original_scene)
+            self.renders.insert(0, job.sequence)
+            return
+        #every frame is rendered again, including any that were reused from an earlier render
+        work_directory = get_work_directory(self.original_scene)
+        job.ranges = [(job.frame_start, job.frame_end)]
+        if job.chunks:
+            chunk_size = max(chunk.frame_end - chunk.frame_start + 1 for chunk in job.chunks)
+            worker_jobs = job.split(chunk_size)
+        else:
+            worker_jobs = [job]
+        for worker_job in worker_jobs:
+            worker_job.blend_file = job.blend_file
+            worker_job.write(work_directory)
+            pool.submit(worker_job)
+        if pool is self.audio_pool:
+            self.audio_jobs.insert(0, job)
+
+    def replace_sequence(self, rendering_sequence, job):
+        """Replaces a sequence in the batch scene with a new sequence importing the output of a finished job
+        Arguments:
+            rendering_sequence: VSE Sequence object to replace, the sequence the job rendered or a duplicate of it
+            job: RenderJob object that has finished rendering"""
+
+        #new sequences are created in the meta being edited, so enter the metas the original sequence is in
+        metas = meta_path(rendering_sequence, self.meta_parents)
+        enter_metas(self.original_scene, metas)
+        sequences = self.original_scene.sequence_editor.sequences
+        if job.kind == 'MOVIE':
+            new_sequence = sequences.new_movie(name=rendering_sequence.name+' rendered', filepath=job.file, channel=rendering_sequence.channel, frame_start=rendering_sequence.frame_final_start)
+        elif job.kind == 'IMAGE':
+            new_sequence = sequences.new_image(name=rendering_sequence.name+' rendered', filepath=job.file, channel=rendering_sequence.channel, frame_start=rendering_sequence.frame_final_start)
+            for file in job.files:
+                new_sequence.elements.append(file)
+        else:
+            new_sequence = sequences.new_sound(name=rendering_sequence.name+' rendered', filepath=job.file, channel=rendering_sequence.channel, frame_start=rendering_sequence.frame_final_start)
         #replace sequence
-        bpy.ops.sequencer.select_all(action='DESELECT')
-        self.copy_settings(self.rendering_sequence, new_sequence)
-        self.rendering_sequence.select = True
+        #nothing else is selected in the batch scene, see start_batch()
+        override = scene_context(self.original_scene)
+        self.copy_settings(rendering_sequence, new_sequence)
+        rendering_sequence.select = True
         new_sequence.select = True
-        self.original_scene.sequence_editor.active_strip = self.rendering_sequence
-
-        for other_sequence in self.original_scene.sequence_editor.sequences_all:
-            if hasattr(other_sequence, 'input_1'):
-                if other_sequence.input_1 == self.rendering_sequence:
-                    other_sequence.input_1 = new_sequence
-            if hasattr(other_sequence, 'input_2'):
-                if other_sequence.input_2 == self.rendering_sequence:
-                    other_sequence.input_2 = new_sequence
+        self.original_scene.sequence_editor.active_strip = rendering_sequence
+
+        replace_dependency(self.dependents, rendering_sequence, new_sequence)
         if not self.original_scene.quick_batch.batch_effects:
-            bpy.ops.sequencer.strip_modifier_copy(type='REPLACE')
+            bpy.ops.sequencer.strip_modifier_copy(override, type='REPLACE')
 
         new_sequence.select = False
-        bpy.ops.sequencer.delete()
+        bpy.ops.sequencer.delete(override)
+        exit_metas(self.original_scene, metas)
+        if metas:
+            self.meta_parents[new_sequence.name] = metas[-1]
+
+    def record_metrics(self, job):
+        """Writes the measurements of a finished job to the metrics log, and updates the progress shown in the panel
+        Arguments:
+            job: RenderJob object that has been imported"""
+
+        self.finished_renders = self.finished_renders + 1
+        render = self.original_scene.render
+        render_time = job.timings.get('render', 0.0)
+        record = {
+            'record': 'strip',
+            'time': time.time(),
+            'sequence': job.sequence_name,
+            'type': job.sequence_type,
+            'frames': job.frames,
+            'preset': job.preset,
+            'kind': job.kind,
+            'cached': job.cached,
+            'passthrough': job.passthrough,
+            'chunks': len(job.chunks),
+            'duplicates': len(job.duplicates),
+            'reused_frames': job.reused_frames,
+            'complexity': job.complexity,
+            'resolution': [render.resolution_x, render.resolution_y, render.resolution_percentage],
+            'bytes': output_size(job),
+            'phases': job.timings,
+            'fps': job.frames / render_time if render_time else None}
+        append_json_line(self.metrics_file, record)
+        if not job.cached and not job.passthrough:
+            self.progress.add(job)
+        else:
+            self.progress.add_cached(job)
+        self.set_status(self.progress.status(self.finished_renders, self.total_renders))
+
+    def set_status(self, status):
+        """Sets the batch status line shown in the panel"""
+
+        self.original_scene.quick_batch.batch_status = status
+        if bpy.context.screen:
+            for area in bpy.context.screen.areas:
+                if area.type == 'SEQUENCE_EDITOR':
+                    area.tag_redraw()
+
+    def next_render(self, wait=False):
+        """Starts rendering the next sequence in the list, sequences found in the render cache are imported straight away
+        Arguments:
+            wait: Boolean, finish rendering the sequence before returning
+        Returns: True if a render was started, False if the list is finished or the sequences left are waiting for their inputs"""
+
+        while len(self.renders) > 0:
+            sequence = next((sequence for sequence in self.renders if not self.waiting_on(sequence)), None)
+            if sequence is None:
+                if self.busy():
+                    #every sequence left is waiting for its inputs to be imported
+                    return False
+                sequence = self.unblocked_renders()[0]
+            self.renders.remove(sequence)
+            job, key = self.ready_job(sequence)
+            if job:
+                self.finish_render(job)
+                continue
+            print('rendering '+sequence.name)
+            self.render_sequence(sequence, key, wait=wait)
+            return True
+        return False
+
+    def end_batch(self, context, status):
+        """Stops the timer and records the end of the batch in the journal
+        Arguments:
+            context: Blender context
+            status: String, 'FINISHED' or 'CANCELLED'
+        Returns: Set containing status, to be returned by modal()"""
+
+        if self._timer:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+        if self.audio_pool and self.audio_pool.busy():
+            self.cancel_pool(self.audio_pool)
+            self.audio_jobs = []
+        if self.output_pool:
+            #files already being checked or moved are finished, the rest are left where they were rendered
+            for job, future in self.output_checks:
+                future.cancel()
+            self.output_pool.shutdown(wait=True)
+            self.collect_checks(requeue=False)
+            self.output_pool = None
+        remove_handler(bpy.app.handlers.render_complete, batch_render_complete_handler)
+        remove_handler(bpy.app.handlers.render_cancel, batch_render_cancel_handler)
+        self.journal.write('finished' if status == 'FINISHED' else 'cancelled', job_gaps=self.job_gaps)
+        if self.cache:
+            #nothing is rendering any more, so the folders of renders that failed or were cancelled before being stored can go
+            self.cache.in_use.intersection_update(self.cache.entries)
+            self.cache.evict()
+            self.cache.flush()
+        clean_work_directory(self.original_scene, keep=self.failed_logs)
+        quick_batch = self.original_scene.quick_batch
+        append_json_line(self.metrics_file, {
+            'record': 'batch',
+            'time': time.time(),
+            'status': status,
+            'strips': self.finished_renders,
+            'failed': self.failed_renders,
+            'wall_time': time.perf_counter() - self.progress.start,
+            'video_frames': self.progress.done_video_frames,
+            'audio_frames': self.progress.done_audio_frames,
+            'workers': quick_batch.batch_workers if quick_batch.batch_parallel else 1,
+            'scene_copy': quick_batch.batch_scene_copy,
+            'scene_copy_time': self.scene_copy_time,
+            'peak_memory': peak_memory(),
+            'job_gaps': self.job_gaps})
+        batch_results.clear()
+        batch_results.update({'status': status, 'batch_scene': self.original_scene.name, 'strips': self.finished_renders, 'failed': self.failed_renders})
+        self.set_status('')
+        if self.job_gaps:
+            average = sum(self.job_gaps) / len(self.job_gaps)
+            message = "Gap between renders: {:.3f}s average, {:.3f}s longest, {:.1f}s total.".format(average, max(self.job_gaps), sum(self.job_gaps))
+            print(message)
+            self.report({'INFO'}, message)
+        return {status}
+
+    def render_failed(self, job):
+        """Reports a job that failed to render and removes its temporary scene, the original sequence is left in the batch scene
+        Arguments:
+            job: RenderJob object that failed"""
+
+        self.failed_renders = self.failed_renders + 1
+        if job.log_file:
+            self.failed_logs.add(job.log_file)
+        #effects using the sequence are rendered from the original
+        self.unfinished.discard(job.sequence_name)
+        for sequence in self.duplicates.get(job.sequence_name, []):
+            self.unfinished.discard(sequence.name)
+        if job.log_file:
+            self.report({'WARNING'}, "Rendering "+job.sequence_name+" failed, see "+job.log_file)
+        else:
+            self.report({'WARNING'}, "Rendering "+job.sequence_name+" failed")
+        delete_scene(job.scene)
+        self.show_scene(self.original_scene)
+
+    def collect_parallel(self):
+        """Imports every job that a worker has finished since the last call"""
+
+        for job in self.pool.poll():
+            if job.parent:
+                #a chunk of a longer strip, the strip is finished once all of its chunks are
+                parent = job.parent
+                parent.remaining_chunks = parent.remaining_chunks - 1
+                if job.returncode != 0:
+                    parent.returncode = job.returncode
+                    parent.log_file = job.log_file
+                if parent.remaining_chunks > 0:
+                    continue
+                job = parent
+                job.render_start = min(chunk.render_start for chunk in job.chunks)
+                job.render_end = max(chunk.render_end for chunk in job.chunks)
+                if job.returncode is None:
+                    job.returncode = 0
+                    if job.is_movie() and not join_movie_chunks([chunk.file for chunk in job.chunks], job.file):
+                        self.report({'WARNING'}, "Joining the rendered chunks of "+job.sequence_name+" failed")
+                        job.returncode = 1
+            if job.returncode == 0:
+                job.timings['render'] = job.render_end - job.render_start
+                self.check_render(job)
+            else:
+                self.render_failed(job)
+            self.report({'INFO'}, "Rendered "+str(self.finished_renders)+" out of "+str(self.total_renders)+" files.  "+str(self.total_frames)+" frames total.")
+        if self.renders:
+            self.submit_ready()
+
+    def modal_parallel(self, context, event):
+        """Modal function used when rendering in background processes, imports each job as its worker finishes"""
+
+        if event.type == 'ESC':
+            self.cancel_parallel(context)
+            self.report({'WARNING'}, "Batch render cancelled, "+str(self.finished_renders)+" out of "+str(self.total_renders)+" files were rendered.")
+            return self.end_batch(context, 'CANCELLED')
+        if event.type == 'TIMER':
+            self.collect_parallel()
+            if not self.pool.busy():
+                return self.finish_batch(context)
+        return {'PASS_THROUGH'}
+
+    def finish_batch(self, context):
+        """Ends the batch once the video renders are done, unless the audio lane is still rendering, files are still being checked,
+        or effects are waiting for their inputs
+        Returns: Set containing status, to be returned by modal()"""
+
+        if self.audio_jobs or self.output_checks or self.renders:
+            return {'PASS_THROUGH'}
+        return self.end_batch(context, 'FINISHED')
 
-    def next_render(self):
-        """Starts rendering the next sequence in the list"""
+    def complete_render(self):
+        """Imports the sequence that just finished rendering in this Blender session, or starts rendering its next range of frames
+        Returns: True if the sequence is still rendering"""
 
-        sequence = self.renders.pop(0)
-        print('rendering '+sequence.name)
-        self.render_sequence(sequence)
+        job = self.rendering_job
+        if not job.returncode and job.ranges:
+            self.render_frames(job)
+            return True
+        self.rendering_job = None
+        self.completed_time = render_completion.get('time', time.perf_counter())
+        if job.returncode:
+            self.render_failed(job)
+            return False
+        job.timings['render'] = self.completed_time - job.render_start
+        self.check_render(job)
+        return False
 
     def modal(self, context, event):
         """Main modal function, handles the render list"""
 
+        if event.type == 'TIMER' and (self.pool or self.rendering_job is None):
+            #importing deletes scenes and strips, so while a strip renders in this window imports wait until it is done
+            self.collect_audio()
+            self.collect_checks()
+        if self.pool:
+            return self.modal_parallel(context, event)
+        if self.rendering_job is None:
+            #the video renders are done, or every sequence was found in the render cache.  Sequences that failed verification are queued again.
+            if self.next_render():
+                return {'PASS_THROUGH'}
+            return self.finish_batch(context)
         if not self.rendering_scene:
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-                self._timer = None
-            return {'CANCELLED'}
+            return self.end_batch(context, 'CANCELLED')
         if not bpy.data.scenes.get(self.rendering_scene_name, False):
             #the user deleted the rendering scene, uh-oh... blender will crash now.
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-                self._timer = None
-            return {'CANCELLED'}
-        if event.type == 'TIMER':
-            if not self.rendering_scene.quick_batch.batch_rendering:
-                if self._timer:
-                    context.window_manager.event_timer_remove(self._timer)
-                    self._timer = None
-                self.finish_render()
-                if len(self.renders) > 0:
-                    self.next_render()
-                    self.report({'INFO'}, "Rendered "+str(self.total_renders - len(self.renders))+" out of "+str(self.total_renders)+" files.  "+str(self.total_frames)+" frames total.")
-                else:
-                    return {'FINISHED'}
-
-            return {'PASS_THROUGH'}
+            return self.end_batch(context, 'CANCELLED')
         if self.rendering_scene.quick_batch.batch_rendering_cancel:
-            if self._timer:
-                context.window_manager.event_timer_remove(self._timer)
-                self._timer = None
             self.renders.clear()
             try:
                 bpy.ops.render.view_cancel()
@@ -423,56 +3297,206 @@ class QuickBatchRender(bpy.types.Operator):
                 context.window_manager.update_tag()
             except:
                 pass
-            return {'CANCELLED'}
+            return self.end_batch(context, 'CANCELLED')
+        if not self.rendering_scene.quick_batch.batch_rendering:
+            #the render finished, handled on whichever event arrives first
+            if self.complete_render():
+                return {'PASS_THROUGH'}
+            self.collect_audio()
+            self.collect_checks()
+            if self.next_render():
+                self.report({'INFO'}, "Rendered "+str(self.finished_renders)+" out of "+str(self.total_renders)+" files.  "+str(self.total_frames)+" frames total.")
+            else:
+                return self.finish_batch(context)
         return {'PASS_THROUGH'}
 
-    def invoke(self, context, event):
-        """Called when the batch render is initialized.  Sets up variables and begins the rendering process."""
+    def start_batch(self, context):
+        """Sets up a batch render: creates the batch scene, or finds it when resuming, queues up the renders and records them in the journal
+        Arguments:
+            context: Blender context the operator was called in
+        Returns: True if there is anything to render"""
+
+        self.completed = {}
+        self.job_gaps = []
+        self.completed_time = None
+        self.journal = get_journal(context.scene)
+        batch = None
+        if self.resume:
+            batch = self.journal.read()
+            if batch is None or batch['ended'] == 'finished':
+                self.report({'WARNING'}, "There is no unfinished batch render to resume.")
+                return False
+            self.completed = batch['completed']
 
-        del event
-        context.window_manager.modal_handler_add(self)
         self.rendering = False
-        oldscene = context.scene
-        quick_batch = oldscene.quick_batch
-        name = oldscene.name + ' Batch Render'
-        bpy.ops.scene.new(type='FULL_COPY')
-        newscene = context.scene
-        newscene.name = name
-
-        if quick_batch.batch_meta == 'SUBSTRIPS':
-            old_sequences = newscene.sequence_editor.sequences_all
+        self.scene_copy_time = 0.0
+        self.pool = None
+        self.audio_pool = None
+        self.audio_jobs = []
+        self.output_checks = []
+        self.requeued = {}
+        self.failed_logs = set()
+        self.rendering_job = None
+        if batch and bpy.data.scenes.get(batch['batch_scene']):
+            #continue in the batch scene, sequences that were already replaced are no longer in it
+            newscene = bpy.data.scenes[batch['batch_scene']]
+            quick_batch = newscene.quick_batch
         else:
-            old_sequences = newscene.sequence_editor.sequences
+            oldscene = context.scene
+            if batch and bpy.data.scenes.get(batch['start']['scene']):
+                oldscene = bpy.data.scenes[batch['start']['scene']]
+            quick_batch = oldscene.quick_batch
+            name = oldscene.name + ' Batch Render'
+            copy_start = time.perf_counter()
+            newscene = new_scene(oldscene, SCENE_COPY_TYPES[quick_batch.batch_scene_copy])
+            if newscene.sequence_editor is None:
+                copy_sequencer(oldscene, newscene)
+            self.scene_copy_time = time.perf_counter() - copy_start
+            newscene.name = name
+        self.show_scene(newscene)
+        self.original_scene = newscene
+        self.curve_index = build_curve_index(newscene)
+        self.meta_parents = build_meta_parents(newscene.sequence_editor.sequences_all)
+        self.dependents = build_dependency_index(newscene.sequence_editor.sequences_all)
+        if quick_batch.batch_cache:
+            cache_directory = os.path.join(get_render_directory(newscene), 'cache')
+            self.cache = RenderCache(cache_directory, max_size=quick_batch.batch_cache_size * 1024 * 1024, verify=quick_batch.batch_cache_verify)
+        else:
+            self.cache = None
+        self.output_pool = concurrent.futures.ThreadPoolExecutor(max_workers=quick_batch.batch_transfer_threads)
+        if quick_batch.batch_reuse_frames:
+            self.frame_manifest = FrameManifest(os.path.join(get_render_directory(newscene), 'frame_manifest.json'))
+        else:
+            self.frame_manifest = None
 
         #queue up renders
-        self.total_frames = 0
-        self.audio_frames = 0
-        self.renders = []
-        for sequence in old_sequences:
-            if (quick_batch.batch_selected and sequence.select) or not quick_batch.batch_selected:
-                if sequence.type == 'MOVIE' or sequence.type == 'IMAGE' or sequence.type == 'MOVIECLIP':
-                    #standard video or image sequence
-                    self.renders.append(sequence)
-                    self.total_frames = self.total_frames + sequence.frame_final_duration
-                elif sequence.type == 'SOUND':
-                    #audio sequence
-                    if quick_batch.batch_audio:
-                        self.renders.append(sequence)
-                        self.audio_frames = self.audio_frames + sequence.frame_final_duration
-                elif sequence.type == 'META':
-                    #meta sequence
-                    if quick_batch.batch_meta == 'SINGLESTRIP':
-                        self.renders.append(sequence)
-                        self.total_frames = self.total_frames + sequence.frame_final_duration
-                else:
-                    #other sequence type, not handled
-                    pass
+        self.renders, self.total_frames, self.audio_frames = build_render_queue(newscene.sequence_editor, quick_batch)
+        if batch:
+            queued = set(batch['queued'])
+            self.renders = [sequence for sequence in self.renders if sequence.name in queued]
+            self.journal.write('resume', batch_scene=newscene.name)
+        else:
+            self.journal.write('start', scene=oldscene.name, batch_scene=newscene.name)
+            #the files of each render are only known once it is set up, they are recorded then
+            for sequence in self.renders:
+                self.journal.write('queued', sequence=sequence.name)
+        #the queue is built, so the selection is no longer needed.  Deselecting everything once here means each render only has to
+        #select and deselect the strips it copies or replaces
+        for sequence in newscene.sequence_editor.sequences_all:
+            sequence.select = False
+        if quick_batch.batch_deduplicate:
+            queued = len(self.renders)
+            self.renders, self.duplicates = group_duplicates(self.renders, newscene, self.curve_index)
+            if queued > len(self.renders):
+                print(str(queued - len(self.renders))+' duplicate strips will reuse the render of an identical strip')
+        else:
+            self.duplicates = {}
+        self.unfinished = set(sequence.name for sequence in self.renders)
+        for duplicates in self.duplicates.values():
+            self.unfinished.update(sequence.name for sequence in duplicates)
+        #effects and metas are keyed by the sequences they use before those are replaced by their renders,
+        #so the key doesn't depend on whether the rendered sequences were imported fresh or from the cache
+        self.source_keys = {}
+        for sequence in self.renders:
+            if self.waiting_on(sequence):
+                self.source_keys[sequence.name] = self.render_key(sequence)
         self.total_renders = len(self.renders)
-        if self.total_renders > 0:
+        self.finished_renders = 0
+        self.failed_renders = 0
+        self.metrics_file = os.path.join(get_render_directory(newscene), 'batch_metrics.jsonl')
+        video_frames = sum(sequence.frame_final_duration for sequence in self.renders if sequence.type != 'SOUND')
+        audio_frames = sum(sequence.frame_final_duration for sequence in self.renders if sequence.type == 'SOUND')
+        self.progress = BatchProgress(video_frames, audio_frames)
+        if self.total_renders == 0:
+            self.journal.write('finished')
+            return False
+        return True
+
+    def invoke(self, context, event):
+        """Called when the batch render is initialized.  Sets up variables and begins the rendering process."""
+
+        del event
+        if not self.start_batch(context):
+            return {'CANCELLED'}
+        context.window_manager.modal_handler_add(self)
+        self.start_audio_lane()
+        if self.original_scene.quick_batch.batch_parallel:
+            self.start_parallel()
+        else:
             self.next_render()
-            return {'RUNNING_MODAL'}
+        if not self._timer:
+            self._timer = context.window_manager.event_timer_add(WAKEUP_INTERVAL, context.window)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        """Runs the whole batch render before returning, without timers or a modal handler, so it works when Blender is running in background mode"""
+
+        if not self.start_batch(context):
+            return {'CANCELLED'}
+        self.start_audio_lane()
+        if self.original_scene.quick_batch.batch_parallel:
+            self.start_parallel()
+            while self.pool.busy() or self.output_checks or self.renders:
+                time.sleep(WAKEUP_INTERVAL)
+                self.collect_parallel()
+                self.collect_audio()
+                self.collect_checks()
         else:
+            #sequences that fail verification are queued again, so keep going until every check is done
+            while self.renders or self.output_checks:
+                #rendering blocks this thread, so the strips already rendered are imported first, or they would wait a whole render
+                #before being recorded as completed in the journal
+                concurrent.futures.wait([future for job, future in self.output_checks])
+                self.collect_audio()
+                self.collect_checks()
+                if self.next_render(wait=True):
+                    self.complete_render()
+                    self.report({'INFO'}, "Rendered "+str(self.finished_renders)+" out of "+str(self.total_renders)+" files.  "+str(self.total_frames)+" frames total.")
+                elif not self.output_checks:
+                    time.sleep(WAKEUP_INTERVAL)
+        while self.audio_jobs or self.output_checks:
+            time.sleep(WAKEUP_INTERVAL)
+            self.collect_audio()
+            self.collect_checks()
+        return self.end_batch(context, 'FINISHED')
+
+
+class QuickBatchRenderResume(bpy.types.Operator):
+    """Resumes the last batch render if it was interrupted, only sequences that were not finished are rendered"""
+
+    bl_idname = 'qbr.resumebatch'
+    bl_label = 'Resume Batch Render'
+    bl_description = 'Continues the last batch render from its journal, rendering only the sequences that were not finished.'
+
+    def invoke(self, context, event):
+        del context
+        del event
+        #the batch render runs as its own modal operator, this one is done once it has started
+        bpy.ops.qbr.quickbatchrender('INVOKE_DEFAULT', resume=True)
+        return {'FINISHED'}
+
+
+class QuickBatchRenderPlan(bpy.types.Operator):
+    """Estimates the time and disk space a batch render will take without rendering anything, and proposes an order to render strips in"""
+
+    bl_idname = 'qbr.planbatch'
+    bl_label = 'Plan Batch Render'
+    bl_description = 'Estimates how long a batch render will take and how much space it needs, without rendering anything.  The plan is printed to the console.'
+
+    def execute(self, context):
+        plan = plan_batch(context.scene)
+        if not plan['jobs']:
+            self.report({'WARNING'}, "There is nothing to render.")
             return {'CANCELLED'}
+        for line in plan_report(plan):
+            print(line)
+        summary = plan_summary(plan)
+        context.scene.quick_batch.batch_status = summary
+        if plan['enough_space']:
+            self.report({'INFO'}, summary)
+        else:
+            self.report({'WARNING'}, summary+', there is not enough free space')
+        return {'FINISHED'}
 
 
 class QuickBatchRenderSetting(bpy.types.PropertyGroup):
@@ -510,7 +3534,106 @@ class QuickBatchRenderSetting(bpy.types.PropertyGroup):
     batch_meta = bpy.props.EnumProperty(
         name="Render Meta Strips",
         default='SINGLESTRIP',
-        items=[('SINGLESTRIP', 'Single Strip', '', 1), ('SUBSTRIPS', 'Individual Substrips', '', 2), ('IGNORE', 'Ignore', '', 3)])
+        items=[('SINGLESTRIP', 'Single Strip', '', 1), ('SUBSTRIPS', 'Individual Substrips', '', 2), ('IGNORE', 'Ignore', '', 3),
+               ('TREE', 'Substrip Tree', 'Render the strips inside meta strips as separate jobs, then each meta strip from its rendered strips', 4)])
+    batch_meta_composite = bpy.props.BoolProperty(
+        name="Render Metas From Substrips",
+        default=True,
+        description="If active, each meta strip is rendered from its rendered strips once they are all done, and replaced by a single strip.")
+    batch_passthrough = bpy.props.BoolProperty(
+        name="Link Unchanged Strips",
+        default=True,
+        description="If active, movie, image and sound strips that are not changed in any way and are already in the format of their render preset are linked into the render directory instead of being rendered.")
+    batch_scene_copy = bpy.props.EnumProperty(
+        name="Batch Scene",
+        default='FULL_COPY',
+        items=[('FULL_COPY', 'Full Copy', 'Copy the scene and everything it uses, the batch scene is fully independent of the original', 1),
+               ('SEQUENCER', 'Sequencer Copy', 'Copy the sequencer strips and scene settings, objects and other data are shared with the original scene', 2)])
+    batch_deduplicate = bpy.props.BoolProperty(
+        name="Render Duplicates Once",
+        default=True,
+        description="If active, strips that would render to the same output, such as the same clip used several times, are rendered once and every copy imports that render.")
+    batch_reuse_frames = bpy.props.BoolProperty(
+        name="Reuse Rendered Frames",
+        default=True,
+        description="If active, image sequence frames from earlier batches are reused, so a strip that was trimmed, extended or moved only renders the frames that are new.")
+    batch_effect_strips = bpy.props.BoolProperty(
+        name="Render Effect Strips",
+        default=False,
+        description="If active, effect strips such as transitions, transforms, color and text are rendered too, after the strips they use are rendered.")
+    batch_audio_lane = bpy.props.BoolProperty(
+        name="Render Audio Separately",
+        default=False,
+        description="If active, audio strips are rendered by background Blender processes while the video strips render, instead of waiting in line with them.")
+    batch_audio_workers = bpy.props.IntProperty(
+        name="Audio Workers",
+        default=2,
+        min=1,
+        description="Number of background Blender processes rendering audio strips at once.")
+    batch_scratch = bpy.props.BoolProperty(
+        name="Render To Scratch Folder",
+        default=False,
+        description="If active, strips are rendered to a fast local folder, and moved to the render directory on background threads while the next strip renders.")
+    batch_scratch_directory = bpy.props.StringProperty(
+        name="Scratch Directory",
+        default='',
+        description="Local folder to render strips to before they are moved, leave blank to use the system temporary folder.",
+        subtype='DIR_PATH')
+    batch_transfer_threads = bpy.props.IntProperty(
+        name="Transfer Threads",
+        default=2,
+        min=1,
+        description="Number of rendered strips verified, and moved from the scratch folder to the render directory, at once.")
+    batch_parallel = bpy.props.BoolProperty(
+        name="Render In Background",
+        default=False,
+        description="If active, strips will be rendered by several background Blender processes at once instead of one at a time in this window.")
+    batch_workers = bpy.props.IntProperty(
+        name="Workers",
+        default=4,
+        min=1,
+        description="Number of background Blender processes to render with at once.")
+    batch_worker_memory = bpy.props.IntProperty(
+        name="Worker Memory Limit",
+        default=0,
+        min=0,
+        subtype='UNSIGNED',
+        description="Maximum memory in megabytes that each background process may use, 0 for no limit.  Only supported on Linux and macOS.")
+    batch_worker_executable = bpy.props.StringProperty(
+        name="Worker Executable",
+        default='',
+        description="Program to run for each background render, leave blank to use this Blender.",
+        subtype='FILE_PATH')
+    batch_cache = bpy.props.BoolProperty(
+        name="Use Render Cache",
+        default=False,
+        description="If active, strips are rendered into a cache folder in the render directory, and strips that have not changed since they were last rendered are reused instead of rendered again.")
+    batch_cache_size = bpy.props.IntProperty(
+        name="Cache Size",
+        default=20480,
+        min=0,
+        description="Maximum size of the render cache in megabytes, the least recently used renders are removed when it grows larger than this.  0 for no limit.")
+    batch_cache_verify = bpy.props.BoolProperty(
+        name="Verify Cache",
+        default=False,
+        description="If active, check that every frame of a cached render still exists before reusing it.")
+    batch_retries = bpy.props.IntProperty(
+        name="Retries",
+        default=1,
+        min=0,
+        description="Number of times a failed background render is started again before giving up on it.")
+    batch_chunk = bpy.props.BoolProperty(
+        name="Split Long Strips",
+        default=False,
+        description="If active, strips longer than the chunk size are split into frame ranges that are rendered by several background processes at once.  Movie chunks are joined with ffmpeg afterwards.")
+    batch_chunk_size = bpy.props.IntProperty(
+        name="Chunk Size",
+        default=500,
+        min=1,
+        description="Maximum number of frames rendered by each background process when splitting long strips.")
+    batch_status = bpy.props.StringProperty(
+        name="Batch Status",
+        default='')
     batch_rendering = bpy.props.BoolProperty(
         name="Currently Rendering File",
         default=False)
@@ -520,7 +3643,7 @@ class QuickBatchRenderSetting(bpy.types.PropertyGroup):
 
 
 #Register properties, operators, menus and shortcuts
-classes = (QuickBatchRender, QuickBatchRenderPanel, QuickBatchRenderSetting)
+classes = (QuickBatchRender, QuickBatchRenderResume, QuickBatchRenderPlan, QuickBatchRenderPanel, QuickBatchRenderSetting)
 
 
 def register():
@@ -531,9 +3654,243 @@ def register():
 
 
 def unregister():
+    remove_handler(bpy.app.handlers.render_complete, batch_render_complete_handler)
+    remove_handler(bpy.app.handlers.render_cancel, batch_render_cancel_handler)
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
 
 
-if __name__ == "__main__":
+#Job spec keys that set a quick_batch property of the scenes being rendered
+SPEC_SETTINGS = {
+    'render_directory': 'batch_render_directory',
+    'video_preset': 'video_settings_menu',
+    'transparent_preset': 'transparent_settings_menu',
+    'audio_preset': 'audio_settings_menu',
+    'effects': 'batch_effects',
+    'audio': 'batch_audio',
+    'meta': 'batch_meta',
+    'meta_composite': 'batch_meta_composite',
+    'effect_strips': 'batch_effect_strips',
+    'scene_copy': 'batch_scene_copy',
+    'deduplicate': 'batch_deduplicate',
+    'passthrough': 'batch_passthrough',
+    'reuse_frames': 'batch_reuse_frames',
+    'audio_lane': 'batch_audio_lane',
+    'audio_workers': 'batch_audio_workers',
+    'scratch': 'batch_scratch',
+    'scratch_directory': 'batch_scratch_directory',
+    'transfer_threads': 'batch_transfer_threads',
+    'worker_memory': 'batch_worker_memory',
+    'retries': 'batch_retries',
+    'cache': 'batch_cache',
+    'cache_size': 'batch_cache_size',
+    'chunk': 'batch_chunk',
+    'chunk_size': 'batch_chunk_size'}
+
+EXIT_SUCCESS = 0
+EXIT_RENDER_FAILED = 1
+EXIT_BAD_SPEC = 2
+EXIT_ERROR = 3
+EXIT_NO_SPACE = 4
+
+
+def load_spec(spec_file):
+    """Reads a job spec file, json or toml depending on the extension.  Reading toml needs the toml module to be installed.
+    Arguments:
+        spec_file: String, path to the job spec
+    Returns: Dictionary"""
+
+    with open(spec_file) as file:
+        if os.path.splitext(spec_file)[1].lower() == '.toml':
+            if toml is None:
+                raise ValueError('reading a toml job spec needs the toml module, use a json job spec instead')
+            spec = toml.load(file)
+        else:
+            spec = json.load(file)
+    if not isinstance(spec, dict):
+        raise ValueError('the job spec must be an object')
+    return spec
+
+
+def strip_matches(sequence, strips):
+    """Checks a sequence against the 'strips' filter of a job spec, every given filter has to match
+    Arguments:
+        sequence: VSE Sequence object
+        strips: Dictionary that may have lists of 'names' (wildcards allowed), 'types' and 'channels'"""
+
+    names = strips.get('names')
+    if names and not any(fnmatch.fnmatchcase(sequence.name, name) for name in names):
+        return False
+    types = strips.get('types')
+    if types and sequence.type not in types:
+        return False
+    channels = strips.get('channels')
+    if channels and sequence.channel not in channels:
+        return False
+    return True
+
+
+def apply_spec(scene, spec):
+    """Sets up the batch render settings of a scene from a job spec, and selects the strips to render if the spec filters them
+    Arguments:
+        scene: Scene object to render
+        spec: Dictionary read by load_spec()"""
+
+    quick_batch = scene.quick_batch
+    for key, setting in sorted(SPEC_SETTINGS.items()):
+        if key in spec:
+            setattr(quick_batch, setting, spec[key])
+    if 'chunk_size' in spec and 'chunk' not in spec:
+        #a chunk size only does anything with chunking on
+        quick_batch.batch_chunk = True
+    for setting, value in sorted(spec.get('settings', {}).items()):
+        if not hasattr(quick_batch, setting):
+            raise ValueError('unknown setting '+setting)
+        setattr(quick_batch, setting, value)
+    if 'workers' in spec:
+        #0 workers renders in this process, more renders in that many background processes
+        quick_batch.batch_parallel = spec['workers'] > 0
+        if spec['workers'] > 0:
+            quick_batch.batch_workers = spec['workers']
+    strips = spec.get('strips')
+    if strips:
+        for sequence in scene.sequence_editor.sequences_all:
+            sequence.select = strip_matches(sequence, strips)
+        quick_batch.batch_selected = True
+
+
+def spec_state(scene, spec):
+    """Returns the settings and strip selection of a scene that apply_spec() will change, so they can be put back after the run
+    Arguments:
+        scene: Scene object to render
+        spec: Dictionary read by load_spec()
+    Returns: Tuple of a dictionary of setting values by property name, and a set of the names of the selected strips or None"""
+
+    quick_batch = scene.quick_batch
+    settings = [setting for key, setting in SPEC_SETTINGS.items() if key in spec]
+    if 'chunk_size' in spec:
+        settings.append('batch_chunk')
+    if isinstance(spec.get('settings'), dict):
+        settings.extend(setting for setting in spec['settings'] if hasattr(quick_batch, setting))
+    settings.extend(['batch_parallel', 'batch_workers', 'batch_selected'])
+    values = dict((setting, getattr(quick_batch, setting)) for setting in settings)
+    selected = None
+    if spec.get('strips'):
+        selected = set(sequence.name for sequence in scene.sequence_editor.sequences_all if sequence.select)
+    return values, selected
+
+
+def restore_spec_state(scene, state):
+    """Puts back the settings and strip selection of a scene saved by spec_state()
+    Arguments:
+        scene: Scene object that was rendered
+        state: Tuple returned by spec_state()"""
+
+    values, selected = state
+    for setting, value in sorted(values.items()):
+        setattr(scene.quick_batch, setting, value)
+    if selected is not None:
+        for sequence in scene.sequence_editor.sequences_all:
+            sequence.select = sequence.name in selected
+
+
+def run_spec(spec_file):
+    """Runs the batch renders described by a job spec without any user interface, then saves the file with the new batch scenes in it.
+    Used from the command line with: blender -b file.blend -P QuickBatchRender.py -- --spec job.json
+    If the spec has 'dry_run' set, each scene is planned with plan_batch() instead, and nothing is rendered or saved.
+    Arguments:
+        spec_file: String, path to the job spec
+    Returns: Integer exit code, EXIT_SUCCESS if every strip was rendered, or for a dry run EXIT_NO_SPACE if there isn't enough free space"""
+
+    try:
+        spec = load_spec(spec_file)
+    except (OSError, ValueError) as error:
+        print('Quick Batch Render: could not read job spec '+spec_file+': '+str(error))
+        return EXIT_BAD_SPEC
+    scene_names = spec.get('scenes') or [bpy.context.scene.name]
+    for scene_name in scene_names:
+        if not bpy.data.scenes.get(scene_name):
+            print('Quick Batch Render: scene '+scene_name+' not found')
+            return EXIT_BAD_SPEC
+    #the sequencer paste operator only runs in a sequencer area, so one is borrowed if the file has none
+    screen = scene_context(bpy.context.scene).get('screen')
+    borrowed_area = None
+    if screen and not any(area.type == 'SEQUENCE_EDITOR' for area in screen.areas):
+        borrowed_area = screen.areas[0]
+        borrowed_type = borrowed_area.type
+        borrowed_area.type = 'SEQUENCE_EDITOR'
+    exit_code = EXIT_SUCCESS
+    plans = []
+    states = []
+    try:
+        for scene_name in scene_names:
+            scene = bpy.data.scenes[scene_name]
+            states.append((scene, spec_state(scene, spec)))
+            try:
+                apply_spec(scene, spec)
+            except (TypeError, ValueError) as error:
+                print('Quick Batch Render: invalid job spec for scene '+scene_name+': '+str(error))
+                return EXIT_BAD_SPEC
+            if spec.get('dry_run'):
+                plan = plan_batch(scene)
+                for line in plan_report(plan):
+                    print(line)
+                plans.append(plan)
+                if not plan['enough_space']:
+                    exit_code = EXIT_NO_SPACE
+                continue
+            batch_results.clear()
+            try:
+                bpy.ops.qbr.quickbatchrender(scene_context(scene), 'EXEC_DEFAULT', resume=bool(spec.get('resume', False)))
+            except RuntimeError as error:
+                print('Quick Batch Render: batch render of '+scene_name+' failed: '+str(error))
+                return EXIT_ERROR
+            if not batch_results:
+                print('Quick Batch Render: nothing to render in '+scene_name)
+                continue
+            print('Quick Batch Render: rendered '+str(batch_results['strips'])+' strips of '+scene_name+' into '+batch_results['batch_scene']+', '+str(batch_results['failed'])+' failed')
+            if batch_results['failed'] or batch_results['status'] != 'FINISHED':
+                exit_code = EXIT_RENDER_FAILED
+    finally:
+        #the spec only applies to this run, the saved file keeps the settings and selection the scenes had
+        for scene, state in reversed(states):
+            restore_spec_state(scene, state)
+        if borrowed_area:
+            borrowed_area.type = borrowed_type
+    if spec.get('dry_run'):
+        if spec.get('plan_file'):
+            with open(bpy.path.abspath(spec['plan_file']), 'w') as plan_file:
+                json.dump(plans, plan_file, indent=4)
+        return exit_code
+    if spec.get('save', True):
+        if spec.get('output_file'):
+            bpy.ops.wm.save_as_mainfile(filepath=bpy.path.abspath(spec['output_file']))
+        else:
+            bpy.ops.wm.save_mainfile()
+    return exit_code
+
+
+def main(argv):
+    """Entry point when this file is run as a script, either to register the addon or from a background worker process
+    Arguments:
+        argv: List of command line arguments, any after '--' are read by this script"""
+
+    if '--' in argv:
+        args = argv[argv.index('--')+1:]
+    else:
+        args = []
+    parser = argparse.ArgumentParser(prog='QuickBatchRender.py')
+    parser.add_argument('--qbr-job', dest='job', default='', help='Render a job file written by a batch render, used by background workers')
+    parser.add_argument('--qbr-memory', dest='memory', type=int, default=0, help='Memory limit in megabytes of a background worker')
+    parser.add_argument('--spec', default='', help='Run the batch renders described by a json or toml job spec, then exit')
+    arguments = parser.parse_args(args)
+    if arguments.job:
+        limit_memory(arguments.memory)
+        sys.exit(run_job_file(arguments.job))
     register()
+    if arguments.spec:
+        sys.exit(run_spec(arguments.spec))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
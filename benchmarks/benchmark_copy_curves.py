@@ -0,0 +1,116 @@
+"""
+Benchmark for copy_curves, compares the bulk keyframe copy against copying one keyframe at a time.
+Builds a scene with color strips whose opacity and color are animated with thousands of keyframes.
+
+Run with:
+    blender -b --factory-startup -P benchmarks/benchmark_copy_curves.py -- [--strips 10] [--keyframes 2000]
+"""
+
+
+import os
+import sys
+import time
+import argparse
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import QuickBatchRender
+
+
+def copy_curves_per_key(copy_from, copy_to, scene_from, scene_to):
+    """The copy_curves implementation before curve indexing and bulk keyframe copies, kept here as the baseline"""
+
+    scene_to.animation_data_create()
+    scene_to.animation_data.action = bpy.data.actions.new(name=scene_to.name+'Action')
+    for fcurve in scene_from.animation_data.action.fcurves:
+        path = fcurve.data_path
+        path_start = path.split('[', 1)[0]
+        path_end = path.split(']')[-1]
+        test_path = path_start+'["'+copy_from.name+'"]'+path_end
+        if path == test_path:
+            new_path = path_start+'["'+copy_to.name+'"]'+path_end
+            new_curve = scene_to.animation_data.action.fcurves.new(data_path=new_path, index=fcurve.array_index)
+            new_curve.extrapolation = fcurve.extrapolation
+            new_curve.mute = fcurve.mute
+            for keyframe in fcurve.keyframe_points:
+                new_curve.keyframe_points.add()
+                new_keyframe = new_curve.keyframe_points[-1]
+                new_keyframe.type = keyframe.type
+                new_keyframe.amplitude = keyframe.amplitude
+                new_keyframe.back = keyframe.back
+                new_keyframe.co = keyframe.co
+                new_keyframe.easing = keyframe.easing
+                new_keyframe.handle_left = keyframe.handle_left
+                new_keyframe.handle_left_type = keyframe.handle_left_type
+                new_keyframe.handle_right = keyframe.handle_right
+                new_keyframe.handle_right_type = keyframe.handle_right_type
+                new_keyframe.interpolation = keyframe.interpolation
+                new_keyframe.period = keyframe.period
+            new_curve.update()
+
+
+def build_scene(strips, keyframes):
+    """Creates a scene with animated color strips, keyframes are added directly to the action to keep setup fast"""
+
+    scene = bpy.data.scenes.new('Copy Curves Benchmark')
+    scene.sequence_editor_create()
+    scene.animation_data_create()
+    action = bpy.data.actions.new('Copy Curves Benchmark Action')
+    scene.animation_data.action = action
+    for index in range(strips):
+        sequence = scene.sequence_editor.sequences.new_effect(name='Strip '+str(index), type='COLOR', channel=(index % 32) + 1, frame_start=1, frame_end=keyframes + 1)
+        base_path = 'sequence_editor.sequences_all["'+sequence.name+'"]'
+        for data_path, array_index in [(base_path+'.blend_alpha', 0), (base_path+'.color', 0), (base_path+'.color', 1), (base_path+'.color', 2)]:
+            fcurve = action.fcurves.new(data_path=data_path, index=array_index)
+            fcurve.keyframe_points.add(keyframes)
+            coordinates = []
+            for frame in range(keyframes):
+                coordinates.extend([frame + 1, (frame % 10) / 10.0])
+            fcurve.keyframe_points.foreach_set('co', coordinates)
+            if keyframes:
+                fcurve.keyframe_points[0].interpolation = 'LINEAR'
+            fcurve.update()
+    return scene
+
+
+def time_copies(copy_function, scene, target_scene, curve_index=None):
+    sequences = list(scene.sequence_editor.sequences)
+    target = target_scene.sequence_editor.sequences[0]
+    start = time.perf_counter()
+    for sequence in sequences:
+        if curve_index is None:
+            copy_function(sequence, target, scene, target_scene)
+        else:
+            copy_function(sequence, target, scene, target_scene, curve_index)
+    return time.perf_counter() - start
+
+
+def main():
+    argv = sys.argv[sys.argv.index('--')+1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(prog='benchmark_copy_curves.py')
+    parser.add_argument('--strips', type=int, default=10)
+    parser.add_argument('--keyframes', type=int, default=2000)
+    arguments = parser.parse_args(argv)
+
+    scene = build_scene(arguments.strips, arguments.keyframes)
+    target_scene = bpy.data.scenes.new('Copy Curves Target')
+    target_scene.sequence_editor_create()
+    target_scene.sequence_editor.sequences.new_effect(name='Target', type='COLOR', channel=1, frame_start=1, frame_end=2)
+
+    per_key = time_copies(copy_curves_per_key, scene, target_scene)
+    start = time.perf_counter()
+    curve_index = QuickBatchRender.build_curve_index(scene)
+    index_time = time.perf_counter() - start
+    bulk = time_copies(QuickBatchRender.copy_curves, scene, target_scene, curve_index)
+
+    total_keyframes = arguments.strips * 4 * arguments.keyframes
+    print('copy_curves benchmark: '+str(arguments.strips)+' strips, '+str(total_keyframes)+' keyframes, numpy '+('enabled' if QuickBatchRender.numpy is not None else 'not available'))
+    print('  per keyframe copy: {:.3f}s'.format(per_key))
+    print('  bulk copy:         {:.3f}s (plus {:.3f}s to build the curve index)'.format(bulk, index_time))
+    if bulk + index_time > 0:
+        print('  speedup:           {:.1f}x'.format(per_key / (bulk + index_time)))
+
+
+if __name__ == "__main__":
+    main()
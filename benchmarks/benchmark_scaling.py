@@ -0,0 +1,231 @@
+"""
+Scaling benchmark for the per-strip overhead of a batch render, runs in plain Python using the bpy stand-in in fake_bpy.py.
+Generates synthetic timelines of movie, image and sound strips, effects, meta strips and animated properties, then times:
+    queue: building the curve, meta and dependency indexes and the render queue, as invoke() does
+    setup: setting up the temporary scene for a strip, as render_sequence() does, including copy_curves
+    copy_curves: copying the animation curves of a strip to its temporary scene
+    finish: importing a rendered strip and rewiring the effects using it, as finish_render() does
+Setup and finish are measured on a sample of the queued strips.  Nothing is actually rendered.
+
+Run with:
+    python benchmarks/benchmark_scaling.py [--sizes 10 100 1000 10000] [--sample 20] [--output report.json] [--compare baseline.json]
+
+When comparing, every time per strip that is more than --threshold slower than in the baseline report is listed as a regression,
+and the exit code is 1.  Differences smaller than --noise seconds per strip are ignored.
+"""
+
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fake_bpy
+bpy = fake_bpy.install()
+import QuickBatchRender
+
+
+def animate(action, sequence, keyframes):
+    """Adds an animation curve with the given number of keyframes to the opacity of a sequence"""
+
+    fcurve = action.fcurves.new(data_path='sequence_editor.sequences_all["'+sequence.name+'"].blend_alpha', index=0)
+    fcurve.keyframe_points.add(keyframes)
+    coordinates = []
+    for frame in range(keyframes):
+        coordinates.extend([sequence.frame_final_start + frame, (frame % 10) / 10.0])
+    fcurve.keyframe_points.foreach_set('co', coordinates)
+    #handles sit either side of each keyframe, as Blender places automatic handles
+    fcurve.keyframe_points.foreach_set('handle_left', [value - 0.5 if index % 2 == 0 else value for index, value in enumerate(coordinates)])
+    fcurve.keyframe_points.foreach_set('handle_right', [value + 0.5 if index % 2 == 0 else value for index, value in enumerate(coordinates)])
+
+
+def build_timeline(strips, keyframes, render_directory, seed=0):
+    """Creates a scene with roughly the given number of strips.
+    About half are movies, the rest are images, sounds, cross fades between two movies and meta strips holding three movies.
+    One in five strips is animated."""
+
+    generator = random.Random(seed)
+    bpy.reset()
+    scene = bpy.data.scenes.new('Scaling Benchmark')
+    scene.quick_batch = QuickBatchRender.QuickBatchRenderSetting()
+    scene.quick_batch.batch_render_directory = render_directory
+    scene.render.filepath = os.path.join(render_directory, '')
+    bpy.context.screen.scene = scene
+    action = bpy.data.actions.new('Scaling Benchmark Action')
+    scene.animation_data_create().action = action
+    sequences = scene.sequence_editor.sequences
+    frame = 1
+    count = 0
+    while count < strips:
+        choice = generator.random()
+        channel = (count % 30) + 1
+        if choice < 0.5:
+            added = [sequences.new_movie(name='Movie '+str(count), filepath='//media/movie'+str(count)+'.mp4', channel=channel, frame_start=frame)]
+        elif choice < 0.65:
+            added = [sequences.new_image(name='Image '+str(count), filepath='//media/image'+str(count)+'.png', channel=channel, frame_start=frame)]
+        elif choice < 0.8:
+            added = [sequences.new_sound(name='Sound '+str(count), filepath='//media/sound'+str(count)+'.wav', channel=channel, frame_start=frame)]
+        elif choice < 0.9:
+            first = sequences.new_movie(name='Movie '+str(count), filepath='//media/movie'+str(count)+'.mp4', channel=channel, frame_start=frame)
+            second = sequences.new_movie(name='Movie '+str(count + 1), filepath='//media/movie'+str(count + 1)+'.mp4', channel=channel + 1, frame_start=frame + 50)
+            cross = sequences.new_effect(name='Cross '+str(count + 2), type='CROSS', channel=channel + 2, frame_start=frame + 50, frame_end=frame + 100, seq1=first, seq2=second)
+            added = [first, second, cross]
+        else:
+            meta = fake_bpy.Sequence('Meta '+str(count), 'META', channel, frame, 300)
+            sequences.append(meta)
+            for index in range(3):
+                child = fake_bpy.Sequence('Meta '+str(count)+' Movie '+str(index), 'MOVIE', index + 1, frame + index * 100, 100)
+                child.filepath = '//media/meta'+str(count)+'_'+str(index)+'.mp4'
+                meta.sequences.append(child)
+            added = [meta] + list(meta.sequences)
+        for sequence in added:
+            if generator.random() < 0.2:
+                animate(action, sequence, keyframes)
+        count = count + len(added)
+        frame = frame + 25
+    return scene
+
+
+def new_operator(scene):
+    """Returns a batch render operator set up on a scene the way invoke() does, without starting any renders"""
+
+    operator = QuickBatchRender.QuickBatchRender()
+    operator.original_scene = scene
+    operator.cache = None
+    operator.completed = {}
+    operator.job_gaps = []
+    operator.finished_renders = 0
+    operator.journal = QuickBatchRender.BatchJournal(os.path.join(QuickBatchRender.get_render_directory(scene), 'batch_journal.jsonl'))
+    operator.metrics_file = os.path.join(QuickBatchRender.get_render_directory(scene), 'batch_metrics.jsonl')
+    return operator
+
+
+def average(values):
+    return sum(values) / len(values) if values else 0.0
+
+
+def measure(strips, keyframes, sample, render_directory):
+    """Builds a timeline and times each part of a batch, returns a dictionary of results for the report"""
+
+    build_start = time.perf_counter()
+    scene = build_timeline(strips, keyframes, render_directory)
+    build_time = time.perf_counter() - build_start
+    #counted before finishing renders, which replaces strips and metas with their imports
+    total_strips = len(scene.sequence_editor.sequences_all)
+    operator = new_operator(scene)
+    quick_batch = scene.quick_batch
+
+    queue_start = time.perf_counter()
+    operator.curve_index = QuickBatchRender.build_curve_index(scene)
+    operator.meta_parents = QuickBatchRender.build_meta_parents(scene.sequence_editor.sequences_all)
+    operator.dependents = QuickBatchRender.build_dependency_index(scene.sequence_editor.sequences_all)
+    renders, total_frames, audio_frames = QuickBatchRender.build_render_queue(scene.sequence_editor, quick_batch)
+    for sequence in scene.sequence_editor.sequences_all:
+        sequence.select = False
+    queue_time = time.perf_counter() - queue_start
+    operator.total_renders = len(renders)
+    operator.progress = QuickBatchRender.BatchProgress(total_frames, audio_frames)
+
+    #sample evenly across the queue, keeping queue order so inputs are replaced before the effects using them
+    step = max(1, len(renders) // sample)
+    sampled = renders[::step][:sample]
+    setup_times = []
+    curve_times = []
+    finish_times = []
+    for sequence in sampled:
+        job = operator.setup_render(sequence)
+        setup_times.append(job.timings['setup'])
+        curve_times.append(job.timings['copy_curves'])
+        job.timings['render'] = 0.0
+        operator.finish_render(job)
+        finish_times.append(job.timings['finish'])
+
+    queued = len(renders)
+    return {
+        'strips': total_strips,
+        'queued': queued,
+        'sampled': len(sampled),
+        'build_timeline': build_time,
+        'queue': queue_time,
+        'per_strip': {
+            'queue': queue_time / queued if queued else 0.0,
+            'setup': average(setup_times),
+            'copy_curves': average(curve_times),
+            'finish': average(finish_times)},
+        'projected_batch_overhead': queue_time + (average(setup_times) + average(finish_times)) * queued}
+
+
+def compare(report, baseline, threshold, noise):
+    """Returns a list of strings describing each time per strip that is slower than the baseline by more than threshold,
+    differences of less than noise seconds are ignored since they are within timer jitter"""
+
+    regressions = []
+    for size, result in sorted(report['sizes'].items(), key=lambda item: int(item[0])):
+        base = baseline['sizes'].get(size)
+        if base is None:
+            continue
+        for phase, value in sorted(result['per_strip'].items()):
+            base_value = base['per_strip'].get(phase)
+            if not base_value or value - base_value < noise:
+                continue
+            change = (value - base_value) / base_value
+            if change > threshold:
+                regressions.append('{} strips, {}: {:.3f}ms per strip, was {:.3f}ms ({:+.0%})'.format(size, phase, value * 1000, base_value * 1000, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='benchmark_scaling.py')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--sample', type=int, default=20, help='Number of strips to time setup and finish on for each size')
+    parser.add_argument('--keyframes', type=int, default=200, help='Keyframes on each animated strip')
+    parser.add_argument('--output', default='', help='Write the report to this json file')
+    parser.add_argument('--compare', default='', help='Report from an earlier run to check for regressions against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Fraction a time per strip may grow by before it is a regression')
+    parser.add_argument('--noise', type=float, default=0.0001, help='Differences in seconds per strip smaller than this are never regressions')
+    arguments = parser.parse_args()
+
+    report = {
+        'time': time.time(),
+        'python': platform.python_version(),
+        'numpy': QuickBatchRender.numpy is not None,
+        'quick_batch_version': list(QuickBatchRender.bl_info['version']),
+        'keyframes': arguments.keyframes,
+        'sizes': {}}
+    render_directory = tempfile.mkdtemp(prefix='qbr_benchmark_')
+    try:
+        print('size      strips  queued  queue/strip  setup/strip  curves/strip  finish/strip  projected')
+        for size in arguments.sizes:
+            result = measure(size, arguments.keyframes, arguments.sample, render_directory)
+            report['sizes'][str(size)] = result
+            per_strip = result['per_strip']
+            print('{:<8} {:>7} {:>7} {:>10.3f}ms {:>10.3f}ms {:>11.3f}ms {:>11.3f}ms {:>9.2f}s'.format(
+                size, result['strips'], result['queued'], per_strip['queue'] * 1000, per_strip['setup'] * 1000,
+                per_strip['copy_curves'] * 1000, per_strip['finish'] * 1000, result['projected_batch_overhead']))
+    finally:
+        shutil.rmtree(render_directory, ignore_errors=True)
+
+    if arguments.output:
+        with open(arguments.output, 'w') as report_file:
+            json.dump(report, report_file, indent=4, sort_keys=True)
+    if arguments.compare:
+        with open(arguments.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(report, baseline, arguments.threshold, arguments.noise)
+        if regressions:
+            print('Regressions against '+arguments.compare+':')
+            for regression in regressions:
+                print('  '+regression)
+            sys.exit(1)
+        print('No regressions against '+arguments.compare)
+
+
+if __name__ == "__main__":
+    main()
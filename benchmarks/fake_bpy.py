@@ -0,0 +1,715 @@
+"""
+A lightweight stand-in for the parts of the bpy module used by QuickBatchRender, so its per-strip overhead can be measured outside of Blender.
+Only the data model is imitated: scenes, sequence editors with meta strips and effect inputs, actions with animation curves,
+and the sequencer, scene and render operators used by a batch render.  Nothing is drawn or rendered, render output is simulated by
+creating empty files only when a benchmark asks for it.
+
+Call install() before importing QuickBatchRender.
+"""
+
+
+import os
+import sys
+import copy
+import types
+
+
+#Property definitions, class attributes on operators and property groups resolve to their default values
+def _property(*args, **kwargs):
+    del args
+    return kwargs.get('default')
+
+
+props = types.ModuleType('bpy.props')
+for _name in ['BoolProperty', 'IntProperty', 'FloatProperty', 'StringProperty', 'EnumProperty', 'PointerProperty', 'CollectionProperty']:
+    setattr(props, _name, _property)
+
+
+class RNAProperty(object):
+    def __init__(self, identifier, prop_type, array_length=0):
+        self.identifier = identifier
+        self.type = prop_type
+        self.array_length = array_length
+        self.is_enum_flag = False
+        self.is_readonly = False
+
+
+class RNAStruct(object):
+    def __init__(self, properties):
+        self.properties = [RNAProperty(*prop) for prop in properties]
+
+
+class Struct(object):
+    """Base for fake data objects, RNA lists the simple properties reported through bl_rna"""
+
+    RNA = []
+
+    @property
+    def bl_rna(self):
+        return RNAStruct(self.RNA)
+
+
+class Collection(list):
+    """List that also supports lookups by name, like bpy_prop_collection"""
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            for item in self:
+                if item.name == key:
+                    return item
+            raise KeyError(key)
+        return list.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        for item in self:
+            if item.name == key:
+                return item
+        return default
+
+
+class Keyframe(Struct):
+    def __init__(self):
+        self.co = [0.0, 0.0]
+        self.handle_left = [0.0, 0.0]
+        self.handle_right = [0.0, 0.0]
+        self.amplitude = 0.0
+        self.back = 0.0
+        self.period = 0.0
+        self.type = 'KEYFRAME'
+        self.interpolation = 'BEZIER'
+        self.easing = 'AUTO'
+        self.handle_left_type = 'AUTO_CLAMPED'
+        self.handle_right_type = 'AUTO_CLAMPED'
+
+
+class KeyframePoints(list):
+    def add(self, count=1):
+        for index in range(count):
+            self.append(Keyframe())
+
+    def foreach_get(self, attribute, buffer):
+        index = 0
+        for keyframe in self:
+            value = getattr(keyframe, attribute)
+            if isinstance(value, list):
+                for item in value:
+                    buffer[index] = item
+                    index = index + 1
+            else:
+                buffer[index] = value
+                index = index + 1
+
+    def foreach_set(self, attribute, buffer):
+        if not self:
+            return
+        size = len(buffer) // len(self)
+        for index, keyframe in enumerate(self):
+            if size > 1:
+                setattr(keyframe, attribute, [float(value) for value in buffer[index*size:(index+1)*size]])
+            else:
+                setattr(keyframe, attribute, float(buffer[index]))
+
+
+class FCurve(Struct):
+    def __init__(self, data_path, index=0):
+        self.data_path = data_path
+        self.array_index = index
+        self.extrapolation = 'CONSTANT'
+        self.mute = False
+        self.keyframe_points = KeyframePoints()
+
+    def update(self):
+        pass
+
+
+class FCurves(list):
+    def new(self, data_path, index=0, action_group=''):
+        del action_group
+        fcurve = FCurve(data_path, index)
+        self.append(fcurve)
+        return fcurve
+
+
+class Action(Struct):
+    def __init__(self, name):
+        self.name = name
+        self.fcurves = FCurves()
+
+
+class AnimData(object):
+    def __init__(self):
+        self.action = None
+
+
+class Modifier(Struct):
+    RNA = [('name', 'STRING'), ('type', 'ENUM'), ('mute', 'BOOLEAN'), ('input_mask_type', 'ENUM')]
+
+    def __init__(self, name, modifier_type):
+        self.name = name
+        self.type = modifier_type
+        self.mute = False
+        self.input_mask_type = 'STRIP'
+        self.show_expanded = True
+
+
+class Modifiers(list):
+    def new(self, name, type):
+        modifier = Modifier(name, type)
+        self.append(modifier)
+        return modifier
+
+
+class Element(object):
+    """Strip element, the original size is what Blender reports once the source has been loaded"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.orig_width = 1920
+        self.orig_height = 1080
+
+
+class Elements(list):
+    def append(self, filename):
+        list.append(self, Element(filename))
+
+
+class Sound(object):
+    def __init__(self, filepath):
+        self.filepath = filepath
+
+
+EFFECT_TYPES = ['CROSS', 'ADD', 'SUBTRACT', 'ALPHA_OVER', 'ALPHA_UNDER', 'GAMMA_CROSS', 'MULTIPLY', 'OVER_DROP', 'WIPE', 'GLOW', 'TRANSFORM', 'COLOR', 'SPEED', 'MULTICAM', 'ADJUSTMENT', 'GAUSSIAN_BLUR', 'TEXT', 'COLORMIX']
+
+
+class Sequence(Struct):
+    RNA = [('name', 'STRING'), ('type', 'ENUM'), ('select', 'BOOLEAN'), ('lock', 'BOOLEAN'), ('mute', 'BOOLEAN'), ('channel', 'INT'),
+           ('frame_start', 'INT'), ('frame_final_start', 'INT'), ('frame_final_end', 'INT'), ('frame_final_duration', 'INT'),
+           ('frame_offset_start', 'INT'), ('frame_offset_end', 'INT'), ('frame_still_start', 'INT'), ('frame_still_end', 'INT'),
+           ('animation_offset_start', 'INT'), ('animation_offset_end', 'INT'), ('blend_type', 'ENUM'), ('blend_alpha', 'FLOAT'),
+           ('alpha_mode', 'ENUM'), ('color_saturation', 'FLOAT'), ('color_multiply', 'FLOAT'), ('use_flip_x', 'BOOLEAN'),
+           ('use_flip_y', 'BOOLEAN'), ('use_reverse_frames', 'BOOLEAN'), ('strobe', 'FLOAT'), ('use_crop', 'BOOLEAN'),
+           ('use_translation', 'BOOLEAN'), ('speed_factor', 'FLOAT'), ('volume', 'FLOAT'), ('pitch', 'FLOAT'), ('pan', 'FLOAT')]
+
+    def __init__(self, name, sequence_type, channel, frame_start, length):
+        self.name = name
+        self.type = sequence_type
+        self.select = False
+        self.lock = False
+        self.mute = False
+        self.channel = channel
+        self.frame_start = frame_start
+        self.frame_offset_start = 0
+        self.frame_offset_end = 0
+        self.frame_still_start = 0
+        self.frame_still_end = 0
+        self.animation_offset_start = 0
+        self.animation_offset_end = 0
+        self.frame_duration = length
+        self.blend_type = 'REPLACE' if sequence_type not in EFFECT_TYPES else 'CROSS'
+        self.blend_alpha = 1.0
+        self.alpha_mode = 'STRAIGHT'
+        self.color_saturation = 1.0
+        self.color_multiply = 1.0
+        self.use_flip_x = False
+        self.use_flip_y = False
+        self.use_reverse_frames = False
+        self.strobe = 1.0
+        self.use_crop = False
+        self.use_translation = False
+        self.speed_factor = 1.0
+        self.volume = 1.0
+        self.pitch = 1.0
+        self.pan = 0.0
+        self.modifiers = Modifiers()
+        self.filepath = ''
+        self.directory = ''
+        self.elements = Elements()
+        self.sound = None
+        self.clip = None
+        self.scene = None
+        self.sequences = Collection()
+        if sequence_type in EFFECT_TYPES:
+            self.input_1 = None
+            self.input_2 = None
+
+    @property
+    def frame_final_start(self):
+        return self.frame_start + self.frame_offset_start
+
+    @property
+    def frame_final_end(self):
+        return self.frame_start + self.frame_duration - self.frame_offset_end
+
+    @property
+    def frame_final_duration(self):
+        return self.frame_final_end - self.frame_final_start
+
+
+class SequenceCollection(Collection):
+    """Top level sequence list of a sequence editor, new sequences are created in the meta strip being edited, as in Blender"""
+
+    def __init__(self, editor):
+        Collection.__init__(self)
+        self.editor = editor
+
+    def _add(self, sequence):
+        #new strips start out selected, as in Blender
+        sequence.select = True
+        self.editor.unique_name(sequence)
+        self.editor.current_level().append(sequence)
+        return sequence
+
+    def new_movie(self, name, filepath, channel, frame_start):
+        sequence = Sequence(name, 'MOVIE', channel, frame_start, 100)
+        sequence.filepath = filepath
+        sequence.fps = 24.0
+        sequence.elements.append(os.path.basename(filepath))
+        return self._add(sequence)
+
+    def new_image(self, name, filepath, channel, frame_start):
+        sequence = Sequence(name, 'IMAGE', channel, frame_start, 1)
+        sequence.directory = os.path.dirname(filepath)
+        sequence.elements.append(os.path.basename(filepath))
+        return self._add(sequence)
+
+    def new_sound(self, name, filepath, channel, frame_start):
+        sequence = Sequence(name, 'SOUND', channel, frame_start, 100)
+        sequence.sound = Sound(filepath)
+        return self._add(sequence)
+
+    def new_effect(self, name, type, channel, frame_start, frame_end=0, seq1=None, seq2=None):
+        sequence = Sequence(name, type, channel, frame_start, max(1, frame_end - frame_start))
+        sequence.input_1 = seq1
+        sequence.input_2 = seq2
+        return self._add(sequence)
+
+
+class SequenceEditor(object):
+    def __init__(self):
+        self.sequences = SequenceCollection(self)
+        self.metastack = []
+        self.active_strip = None
+
+    @property
+    def sequences_all(self):
+        found = Collection()
+        check = list(self.sequences)
+        while check:
+            sequence = check.pop(0)
+            found.append(sequence)
+            check.extend(sequence.sequences)
+        return found
+
+    def current_level(self):
+        if self.metastack:
+            return self.metastack[-1].sequences
+        return self.sequences
+
+    def unique_name(self, sequence):
+        names = set(other.name for other in self.sequences_all)
+        if sequence.name in names:
+            base = sequence.name
+            number = 1
+            while base+'.'+str(number).zfill(3) in names:
+                number = number + 1
+            sequence.name = base+'.'+str(number).zfill(3)
+
+
+class ImageSettings(Struct):
+    RNA = [('file_format', 'ENUM'), ('color_mode', 'ENUM'), ('color_depth', 'ENUM'), ('quality', 'INT'), ('compression', 'INT'), ('exr_codec', 'ENUM'), ('tiff_codec', 'ENUM')]
+
+    def __init__(self):
+        self.file_format = 'PNG'
+        self.color_mode = 'RGB'
+        self.color_depth = '8'
+        self.quality = 90
+        self.compression = 15
+        self.exr_codec = 'ZIP'
+        self.tiff_codec = 'DEFLATE'
+
+
+class FFmpegSettings(Struct):
+    RNA = [('format', 'ENUM'), ('codec', 'ENUM'), ('video_bitrate', 'INT'), ('maxrate', 'INT'), ('audio_codec', 'ENUM'), ('audio_mixrate', 'INT')]
+
+    def __init__(self):
+        self.format = 'MPEG4'
+        self.codec = 'H264'
+        self.video_bitrate = 6000
+        self.maxrate = 9000
+        self.audio_codec = 'NONE'
+        self.audio_mixrate = 48000
+
+
+MOVIE_EXTENSIONS = {'AVI_JPEG': '.avi', 'AVI_RAW': '.avi', 'H264': '.mp4', 'FFMPEG': '.mp4', 'THEORA': '.ogv', 'XVID': '.avi'}
+IMAGE_EXTENSIONS = {'PNG': '.png', 'JPEG': '.jpg', 'TIFF': '.tif', 'OPEN_EXR': '.exr'}
+
+
+class RenderSettings(object):
+    def __init__(self, scene):
+        self.scene = scene
+        self.resolution_x = 1920
+        self.resolution_y = 1080
+        self.resolution_percentage = 100
+        self.fps = 24
+        self.fps_base = 1.0
+        self.filepath = '/tmp/'
+        self.image_settings = ImageSettings()
+        self.ffmpeg = FFmpegSettings()
+
+    def frame_path(self, frame=0):
+        file_format = self.image_settings.file_format
+        if file_format in MOVIE_EXTENSIONS:
+            return self.filepath+str(self.scene.frame_start).zfill(4)+'-'+str(self.scene.frame_end).zfill(4)+MOVIE_EXTENSIONS[file_format]
+        return self.filepath+str(frame).zfill(4)+IMAGE_EXTENSIONS.get(file_format, '.png')
+
+
+class Scene(object):
+    def __init__(self, name):
+        self.name = name
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_current = 1
+        self.render = RenderSettings(self)
+        self.sequence_editor = SequenceEditor()
+        self.animation_data = None
+        self.quick_batch = None
+        self.users = 1
+
+    def animation_data_create(self):
+        if self.animation_data is None:
+            self.animation_data = AnimData()
+        return self.animation_data
+
+    def sequence_editor_create(self):
+        if self.sequence_editor is None:
+            self.sequence_editor = SequenceEditor()
+        return self.sequence_editor
+
+    def user_clear(self):
+        self.users = 0
+
+    def update(self):
+        pass
+
+
+class DataCollection(Collection):
+    def __init__(self, item_class):
+        Collection.__init__(self)
+        self.item_class = item_class
+
+    def new(self, name):
+        names = set(item.name for item in self)
+        new_name = name
+        number = 1
+        while new_name in names:
+            new_name = name+'.'+str(number).zfill(3)
+            number = number + 1
+        item = self.item_class(new_name)
+        self.append(item)
+        return item
+
+    def remove(self, item):
+        list.remove(self, item)
+
+
+class Libraries(Collection):
+    def write(self, filepath, datablocks, relative_remap=False, fake_user=False):
+        del filepath
+        del relative_remap
+        del fake_user
+        if not isinstance(datablocks, set):
+            raise TypeError('datablocks must be a set')
+
+
+class Data(object):
+    def __init__(self):
+        self.scenes = DataCollection(Scene)
+        self.actions = DataCollection(Action)
+        self.libraries = Libraries()
+
+
+class Region(object):
+    def __init__(self, region_type):
+        self.type = region_type
+
+
+class Area(object):
+    def __init__(self, area_type):
+        self.type = area_type
+        self.regions = [Region('HEADER'), Region('WINDOW')]
+
+    def tag_redraw(self):
+        pass
+
+
+class Screen(object):
+    def __init__(self):
+        self.scene = None
+        self.areas = [Area('SEQUENCE_EDITOR')]
+
+
+class Window(object):
+    def __init__(self, screen):
+        self.screen = screen
+
+
+class WindowManager(object):
+    def __init__(self, window):
+        self.windows = [window]
+
+    def event_timer_add(self, time_step, window=None):
+        del window
+        return object()
+
+    def event_timer_remove(self, timer):
+        pass
+
+    def modal_handler_add(self, operator):
+        pass
+
+    def update_tag(self):
+        pass
+
+
+class Context(object):
+    """The context seen by operators, a context override passed to an operator replaces the matching members while it runs"""
+
+    def __init__(self):
+        self.screen = Screen()
+        self.window = Window(self.screen)
+        self.window_manager = WindowManager(self.window)
+        self.override = {}
+
+    @property
+    def scene(self):
+        return self.override.get('scene', self.screen.scene)
+
+    @property
+    def sequences(self):
+        return self.scene.sequence_editor.sequences if self.scene else None
+
+    def copy(self):
+        return {'scene': self.scene, 'window': self.window, 'screen': self.screen, 'area': self.screen.areas[0], 'window_manager': self.window_manager}
+
+
+data = Data()
+context = Context()
+clipboard = []
+
+
+def _copy_sequences(sequences, mapping):
+    """Duplicates sequences, including meta contents, and points copied effects at copied inputs where possible"""
+
+    copies = []
+    for sequence in sequences:
+        duplicate = copy.copy(sequence)
+        duplicate.modifiers = Modifiers(copy.copy(modifier) for modifier in sequence.modifiers)
+        duplicate.elements = Elements(sequence.elements)
+        duplicate.sequences = Collection(_copy_sequences(sequence.sequences, mapping))
+        mapping[id(sequence)] = duplicate
+        copies.append(duplicate)
+    for duplicate in copies:
+        for attribute in ['input_1', 'input_2']:
+            input_sequence = getattr(duplicate, attribute, None)
+            if input_sequence is not None and id(input_sequence) in mapping:
+                setattr(duplicate, attribute, mapping[id(input_sequence)])
+    return copies
+
+
+def _new_scene(source, scene_type):
+    scene = data.scenes.new(source.name)
+    scene.render.resolution_x = source.render.resolution_x
+    scene.render.resolution_y = source.render.resolution_y
+    scene.render.resolution_percentage = source.render.resolution_percentage
+    scene.render.fps = source.render.fps
+    scene.render.filepath = source.render.filepath
+    scene.render.image_settings = copy.copy(source.render.image_settings)
+    scene.render.ffmpeg = copy.copy(source.render.ffmpeg)
+    scene.frame_start = source.frame_start
+    scene.frame_end = source.frame_end
+    scene.frame_current = source.frame_current
+    scene.quick_batch = copy.copy(source.quick_batch)
+    if scene_type == 'EMPTY':
+        return scene
+    #only a full copy duplicates the sequencer, other copies leave it out along with its animation, as in Blender
+    if scene_type == 'FULL_COPY':
+        for sequence in _copy_sequences(source.sequence_editor.sequences, {}):
+            scene.sequence_editor.sequences.append(sequence)
+    else:
+        scene.sequence_editor = None
+    if source.animation_data and source.animation_data.action:
+        scene.animation_data_create()
+        action = copy.deepcopy(source.animation_data.action)
+        if scene_type != 'FULL_COPY':
+            action.fcurves[:] = [fcurve for fcurve in action.fcurves if not fcurve.data_path.startswith('sequence_editor.sequences_all[')]
+        scene.animation_data.action = action
+    return scene
+
+
+def _operator(function):
+    """Wraps a fake operator so it can be called like a Blender operator, with an optional context override and execution context"""
+
+    def call(*args, **kwargs):
+        overrides = [arg for arg in args if isinstance(arg, dict)]
+        previous = context.override
+        if overrides:
+            context.override = overrides[0]
+        try:
+            return function(**kwargs)
+        finally:
+            context.override = previous
+    return call
+
+
+class _Operators(object):
+    """Namespace of fake operators, each returns a status set like a Blender operator"""
+
+    def __init__(self, **functions):
+        for name, function in functions.items():
+            setattr(self, name, _operator(function))
+
+
+def _select_all(action='TOGGLE'):
+    for sequence in context.scene.sequence_editor.current_level():
+        sequence.select = action == 'SELECT'
+    return {'FINISHED'}
+
+
+def _isolated_selection(sequences):
+    for sequence in sequences:
+        inputs = [getattr(sequence, attribute, None) for attribute in ['input_1', 'input_2']]
+        inputs = [input_sequence for input_sequence in inputs if input_sequence is not None]
+        if sequence.select and any(not input_sequence.select for input_sequence in inputs):
+            return False
+        if not sequence.select and any(input_sequence.select for input_sequence in inputs):
+            return False
+    return True
+
+
+def _copy():
+    level = context.scene.sequence_editor.current_level()
+    if not _isolated_selection(level):
+        raise RuntimeError('Error: Please select all related strips')
+    del clipboard[:]
+    clipboard.extend(_copy_sequences([sequence for sequence in level if sequence.select], {}))
+    return {'FINISHED'}
+
+
+def _paste():
+    editor = context.scene.sequence_editor_create()
+    for sequence in editor.current_level():
+        sequence.select = False
+    for sequence in _copy_sequences(clipboard, {}):
+        editor.unique_name(sequence)
+        sequence.select = True
+        editor.current_level().append(sequence)
+    return {'FINISHED'}
+
+
+def _delete():
+    level = context.scene.sequence_editor.current_level()
+    level[:] = [sequence for sequence in level if not sequence.select]
+    return {'FINISHED'}
+
+
+def _meta_toggle():
+    editor = context.scene.sequence_editor
+    active = editor.active_strip
+    if active is not None and active.type == 'META' and active.select:
+        editor.metastack.append(active)
+        editor.active_strip = None
+    elif editor.metastack:
+        meta = editor.metastack.pop()
+        meta.select = True
+        #leaving a meta selects everything in it, as in Blender
+        check = list(meta.sequences)
+        while check:
+            sequence = check.pop()
+            sequence.select = True
+            check.extend(sequence.sequences)
+        editor.active_strip = meta
+    else:
+        return {'CANCELLED'}
+    return {'FINISHED'}
+
+
+def _strip_modifier_copy(type='REPLACE'):
+    del type
+    editor = context.scene.sequence_editor
+    active = editor.active_strip
+    for sequence in editor.current_level():
+        if sequence.select and sequence is not active:
+            sequence.modifiers = Modifiers(copy.copy(modifier) for modifier in active.modifiers)
+    return {'FINISHED'}
+
+
+def _scene_new(type='NEW'):
+    context.screen.scene = _new_scene(context.scene, type)
+    return {'FINISHED'}
+
+
+def _scene_delete():
+    scene = context.scene
+    data.scenes.remove(scene)
+    if context.screen.scene is scene:
+        context.screen.scene = data.scenes[0] if data.scenes else None
+    return {'FINISHED'}
+
+
+def _finished(*args, **kwargs):
+    del args
+    del kwargs
+    return {'FINISHED'}
+
+
+class Operator(object):
+    def report(self, level, message):
+        del level
+        del message
+
+
+ops = types.ModuleType('bpy.ops')
+ops.sequencer = _Operators(select_all=_select_all, copy=_copy, paste=_paste, delete=_delete, meta_toggle=_meta_toggle, strip_modifier_copy=_strip_modifier_copy)
+ops.scene = _Operators(new=_scene_new, delete=_scene_delete)
+ops.render = _Operators(render=_finished, view_cancel=_finished)
+ops.sound = _Operators(mixdown=_finished)
+ops.wm = _Operators(save_as_mainfile=_finished, save_mainfile=_finished)
+ops.qbr = _Operators(quickbatchrender=_finished)
+
+bpy_types = types.ModuleType('bpy.types')
+bpy_types.Panel = object
+bpy_types.Operator = Operator
+bpy_types.PropertyGroup = object
+bpy_types.Scene = Scene
+
+app = types.SimpleNamespace(
+    handlers=types.SimpleNamespace(render_complete=[], render_cancel=[]),
+    binary_path=sys.executable,
+    version=(2, 79, 0))
+
+path = types.SimpleNamespace(
+    abspath=lambda filepath: filepath[2:] if filepath.startswith('//') else filepath,
+    clean_name=lambda name, replace='_': ''.join(character if character.isalnum() or character in '-.' else replace for character in name))
+
+utils = types.SimpleNamespace(register_class=lambda cls: None, unregister_class=lambda cls: None)
+
+
+def install():
+    """Puts this module in sys.modules as 'bpy', so that 'import bpy' finds it"""
+
+    module = sys.modules[__name__]
+    module.types = bpy_types
+    sys.modules['bpy'] = module
+    sys.modules['bpy.props'] = props
+    sys.modules['bpy.types'] = bpy_types
+    sys.modules['bpy.ops'] = ops
+    return module
+
+
+def reset():
+    """Removes all scenes and actions, and clears the clipboard"""
+
+    data.scenes[:] = []
+    data.actions[:] = []
+    del clipboard[:]
+    context.screen.scene = None
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Stands in for a background Blender process in tests of WorkerPool, it accepts the same command line:
+    stub_worker.py -b file.blend -S scene -P QuickBatchRender.py -- --qbr-job job.json --qbr-memory 0
+Instead of rendering, it writes a placeholder to the file the job renders to.
+
+The job file may have a 'stub' dictionary to control it:
+    exit_codes: List of exit codes for each attempt, the last one is used for any attempt after that.  Defaults to [0].
+    sleep: Seconds to wait before writing the file, defaults to 0.
+Attempts are counted in a file next to the job file.
+"""
+
+
+import sys
+import json
+import time
+
+
+def main(argv):
+    job_file = argv[argv.index('--qbr-job')+1]
+    with open(job_file) as file:
+        job = json.load(file)
+    stub = job.get('stub', {})
+    attempts_file = job_file+'.attempts'
+    try:
+        with open(attempts_file) as file:
+            attempt = int(file.read())
+    except (OSError, ValueError):
+        attempt = 0
+    with open(attempts_file, 'w') as file:
+        file.write(str(attempt + 1))
+    time.sleep(stub.get('sleep', 0))
+    exit_codes = stub.get('exit_codes', [0])
+    exit_code = exit_codes[min(attempt, len(exit_codes) - 1)]
+    if exit_code == 0:
+        with open(job['file'], 'wb') as file:
+            file.write(b'rendered '+job['sequence'].encode('utf-8'))
+    print('stub worker: '+job['sequence']+' attempt '+str(attempt + 1)+', exit code '+str(exit_code))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
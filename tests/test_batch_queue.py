@@ -0,0 +1,50 @@
+"""
+Tests of how a batch render picks the next queued sequence, runs in plain Python using the bpy stand-in in benchmarks/fake_bpy.py:
+    python -m unittest discover tests
+"""
+
+
+import os
+import sys
+import unittest
+
+TESTS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIRECTORY), 'benchmarks'))
+sys.path.insert(0, os.path.dirname(TESTS_DIRECTORY))
+import fake_bpy
+bpy = fake_bpy.install()
+import QuickBatchRender
+
+
+class BatchQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.meta = fake_bpy.Sequence('Meta', 'META', 1, 1, 100)
+        self.movie = fake_bpy.Sequence('Movie', 'MOVIE', 1, 1, 50)
+        self.sound = fake_bpy.Sequence('Sound', 'SOUND', 2, 1, 50)
+        self.meta.sequences.append(self.movie)
+        self.meta.sequences.append(self.sound)
+        self.operator = QuickBatchRender.QuickBatchRender()
+        self.operator.rendering_job = None
+        self.operator.output_checks = []
+        self.operator.audio_jobs = []
+        self.operator.pool = None
+        self.operator.unfinished = set(['Meta', 'Sound'])
+
+    def test_audio_lane_counts_as_busy(self):
+        self.assertFalse(self.operator.busy())
+        self.operator.audio_jobs = [QuickBatchRender.RenderJob(self.sound, None)]
+        self.assertTrue(self.operator.busy())
+        #the meta waits for the sound on the audio lane instead of being rendered as if it were stalled
+        self.operator.renders = [self.meta]
+        self.assertEqual(self.operator.take_ready(stalled=not self.operator.busy()), [])
+        self.assertEqual(self.operator.renders, [self.meta])
+
+    def test_meta_is_not_taken_before_its_contents(self):
+        self.operator.renders = [self.meta, self.sound]
+        self.assertEqual(self.operator.unblocked_renders(), [self.sound])
+        self.assertEqual(self.operator.take_ready(stalled=True), [self.sound])
+        self.assertEqual(self.operator.renders, [self.meta])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Tests of RenderCache, runs in plain Python using the bpy stand-in in benchmarks/fake_bpy.py:
+    python -m unittest discover tests
+"""
+
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+TESTS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIRECTORY), 'benchmarks'))
+sys.path.insert(0, os.path.dirname(TESTS_DIRECTORY))
+import fake_bpy
+bpy = fake_bpy.install()
+import QuickBatchRender
+
+
+class RenderCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='qbr_test_')
+        self.cache = QuickBatchRender.RenderCache(os.path.join(self.directory, 'cache'), max_size=10)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def add_entry(self, key, size):
+        """Stores a cache entry holding one file of the given size, returns the path of the file"""
+
+        file = os.path.join(self.cache.entry_directory(key), 'Shot.mp4')
+        with open(file, 'wb') as entry_file:
+            entry_file.write(b'x' * size)
+        self.cache.store(key, 'MOVIE', file, [])
+        return file
+
+    def test_lookup_saves_index_once(self):
+        self.add_entry('first', 4)
+        saved = os.path.getmtime(self.cache.index_file)
+        os.utime(self.cache.index_file, (saved - 100, saved - 100))
+        self.assertIsNotNone(self.cache.lookup('first'))
+        self.assertIsNone(self.cache.lookup('missing'))
+        self.assertEqual(os.path.getmtime(self.cache.index_file), saved - 100)
+        self.cache.flush()
+        self.assertNotEqual(os.path.getmtime(self.cache.index_file), saved - 100)
+        reloaded = QuickBatchRender.RenderCache(self.cache.directory)
+        self.assertEqual(reloaded.entries['first']['last_used'], self.cache.entries['first']['last_used'])
+
+    def test_linked_outputs_survive_eviction(self):
+        file = self.add_entry('first', 8)
+        job = QuickBatchRender.RenderJob(fake_bpy.Sequence('Shot', 'MOVIE', 1, 1, 10), None, key='first')
+        job.kind = 'MOVIE'
+        job.file = file
+        QuickBatchRender.link_outputs(job, self.directory)
+        self.assertEqual(job.file, os.path.join(self.directory, 'Shot.mp4'))
+        #a new batch no longer holds the first entry, so storing a second one over the size limit evicts it
+        self.cache.in_use.clear()
+        self.add_entry('second', 8)
+        self.assertNotIn('first', self.cache.entries)
+        self.assertFalse(os.path.exists(file))
+        with open(job.file, 'rb') as linked_file:
+            self.assertEqual(linked_file.read(), b'x' * 8)
+
+    def test_unfinished_renders_are_removed(self):
+        #a folder left by a render from an earlier batch that never finished, and one for a render still in progress
+        left = os.path.join(self.cache.directory, 'left')
+        os.makedirs(left)
+        with open(os.path.join(left, 'Shot.mp4'), 'wb') as left_file:
+            left_file.write(b'x' * 8)
+        rendering = self.cache.entry_directory('rendering')
+        self.add_entry('first', 1)
+        self.assertFalse(os.path.exists(left))
+        self.assertTrue(os.path.isdir(rendering))
+        #once the batch is over, the render that was never stored is removed too
+        self.cache.in_use.intersection_update(self.cache.entries)
+        self.cache.evict()
+        self.assertFalse(os.path.exists(rendering))
+        self.assertIn('first', self.cache.entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
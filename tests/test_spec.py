@@ -0,0 +1,58 @@
+"""
+Tests of applying command line job specs to a scene, runs in plain Python using the bpy stand-in in benchmarks/fake_bpy.py:
+    python -m unittest discover tests
+"""
+
+
+import os
+import sys
+import unittest
+
+TESTS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIRECTORY), 'benchmarks'))
+sys.path.insert(0, os.path.dirname(TESTS_DIRECTORY))
+import fake_bpy
+bpy = fake_bpy.install()
+import QuickBatchRender
+
+
+class SpecTest(unittest.TestCase):
+    def setUp(self):
+        bpy.reset()
+        self.scene = bpy.data.scenes.new('Edit')
+        self.scene.quick_batch = QuickBatchRender.QuickBatchRenderSetting()
+        self.scene.quick_batch.batch_chunk = False
+
+    def test_chunk_size_turns_chunking_on(self):
+        QuickBatchRender.apply_spec(self.scene, {'chunk_size': 25})
+        self.assertTrue(self.scene.quick_batch.batch_chunk)
+        self.assertEqual(self.scene.quick_batch.batch_chunk_size, 25)
+
+    def test_chunk_given_directly(self):
+        QuickBatchRender.apply_spec(self.scene, {'chunk': False, 'chunk_size': 25})
+        self.assertFalse(self.scene.quick_batch.batch_chunk)
+        QuickBatchRender.apply_spec(self.scene, {'chunk': True})
+        self.assertTrue(self.scene.quick_batch.batch_chunk)
+
+    def test_state_is_restored(self):
+        quick_batch = self.scene.quick_batch
+        chunk_size = quick_batch.batch_chunk_size
+        shot = self.scene.sequence_editor.sequences.new_movie(name='Shot', filepath='//shot.mp4', channel=1, frame_start=1)
+        other = self.scene.sequence_editor.sequences.new_movie(name='Other', filepath='//other.mp4', channel=2, frame_start=1)
+        shot.select = False
+        other.select = True
+        spec = {'chunk_size': 25, 'workers': 2, 'strips': {'names': ['Shot']}}
+        state = QuickBatchRender.spec_state(self.scene, spec)
+        QuickBatchRender.apply_spec(self.scene, spec)
+        self.assertTrue(shot.select)
+        self.assertFalse(other.select)
+        QuickBatchRender.restore_spec_state(self.scene, state)
+        self.assertFalse(quick_batch.batch_chunk)
+        self.assertEqual(quick_batch.batch_chunk_size, chunk_size)
+        self.assertFalse(quick_batch.batch_selected)
+        self.assertFalse(shot.select)
+        self.assertTrue(other.select)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Tests of WorkerPool, with stub_worker.py standing in for background Blender processes.
+Runs in plain Python using the bpy stand-in in benchmarks/fake_bpy.py:
+    python -m unittest discover tests
+"""
+
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import unittest
+
+TESTS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIRECTORY), 'benchmarks'))
+sys.path.insert(0, os.path.dirname(TESTS_DIRECTORY))
+import fake_bpy
+bpy = fake_bpy.install()
+import QuickBatchRender
+
+STUB_WORKER = os.path.join(TESTS_DIRECTORY, 'stub_worker.py')
+
+
+class WorkerPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='qbr_test_')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def new_job(self, name, exit_codes=(0,), sleep=0):
+        """Returns a RenderJob with its job file written, telling the stub worker how to behave"""
+
+        sequence = fake_bpy.Sequence(name, 'MOVIE', 1, 1, 10)
+        job = QuickBatchRender.RenderJob(sequence, None)
+        job.file = os.path.join(self.directory, 'output '+name)
+        job.write(self.directory)
+        with open(job.job_file) as job_file:
+            description = json.load(job_file)
+        description['stub'] = {'exit_codes': list(exit_codes), 'sleep': sleep}
+        with open(job.job_file, 'w') as job_file:
+            json.dump(description, job_file)
+        return job
+
+    def wait(self, pool, timeout=30):
+        """Polls a pool until every job is finished, returns the finished jobs"""
+
+        finished = []
+        give_up = time.time() + timeout
+        while pool.busy():
+            self.assertLess(time.time(), give_up, 'the workers did not finish')
+            finished.extend(pool.poll())
+            time.sleep(0.02)
+        return finished
+
+    def test_submit_and_poll(self):
+        pool = QuickBatchRender.WorkerPool(STUB_WORKER, 'batch.blend', workers=2)
+        jobs = [self.new_job('Shot '+str(index)) for index in range(3)]
+        for job in jobs:
+            pool.submit(job)
+        self.assertEqual(len(pool.running), 2)
+        self.assertEqual(len(pool.pending), 1)
+        finished = self.wait(pool)
+        self.assertEqual(sorted(job.sequence_name for job in finished), ['Shot 0', 'Shot 1', 'Shot 2'])
+        for job in jobs:
+            self.assertEqual(job.returncode, 0)
+            self.assertTrue(os.path.isfile(job.file))
+            self.assertIsNotNone(job.render_end)
+
+    def test_retry(self):
+        pool = QuickBatchRender.WorkerPool(STUB_WORKER, 'batch.blend', workers=2, retries=1)
+        recovers = self.new_job('Recovers', exit_codes=[1, 0])
+        fails = self.new_job('Fails', exit_codes=[1])
+        pool.submit(recovers)
+        pool.submit(fails)
+        self.wait(pool)
+        self.assertEqual(recovers.returncode, 0)
+        self.assertEqual(recovers.attempts, 1)
+        self.assertTrue(os.path.isfile(recovers.file))
+        self.assertEqual(fails.returncode, 1)
+        self.assertEqual(fails.attempts, 1)
+        self.assertFalse(os.path.isfile(fails.file))
+
+    def test_missing_executable(self):
+        pool = QuickBatchRender.WorkerPool(os.path.join(self.directory, 'missing'), 'batch.blend', workers=1, retries=1)
+        job = self.new_job('Shot')
+        pool.submit(job)
+        self.assertTrue(pool.busy())
+        finished = self.wait(pool)
+        self.assertEqual(finished, [job])
+        self.assertEqual(job.returncode, QuickBatchRender.WORKER_START_FAILED)
+        self.assertEqual(job.attempts, 1)
+        with open(job.log_file) as log_file:
+            self.assertIn('could not start the worker', log_file.read())
+
+    def test_cancel(self):
+        pool = QuickBatchRender.WorkerPool(STUB_WORKER, 'batch.blend', workers=1)
+        jobs = [self.new_job('Slow '+str(index), sleep=60) for index in range(2)]
+        for job in jobs:
+            pool.submit(job)
+        start = time.time()
+        pool.cancel()
+        self.assertLess(time.time() - start, 10)
+        self.assertFalse(pool.busy())
+        self.assertEqual(pool.poll(), [])
+        for job in jobs:
+            self.assertFalse(os.path.isfile(job.file))
+
+    def test_job_files_are_unique(self):
+        first = self.new_job('Shot 1')
+        second = self.new_job('Shot_1')
+        self.assertNotEqual(first.job_file, second.job_file)
+        self.assertNotEqual(first.log_file, second.log_file)
+        pool = QuickBatchRender.WorkerPool(STUB_WORKER, 'batch.blend', workers=2)
+        pool.submit(first)
+        pool.submit(second)
+        self.wait(pool)
+        self.assertTrue(os.path.isfile(first.file))
+        self.assertTrue(os.path.isfile(second.file))
+
+
+if __name__ == "__main__":
+    unittest.main()